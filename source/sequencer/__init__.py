@@ -2,10 +2,16 @@ import logging
 import os
 import sys
 
-from sequencer.collector import collect
-from sequencer.sequence import Sequence
+from sequencer.collector import collect, collect_manifest, iter_collect
+from sequencer.sequence import FrozenSequence, Sequence
 
-__all__ = ['collect', 'Sequence']
+__all__ = [
+    'collect',
+    'collect_manifest',
+    'iter_collect',
+    'FrozenSequence',
+    'Sequence',
+]
 
 logger = logging.getLogger(__name__)
 logger.setLevel(os.getenv('SEQUENCER_LOG_LEVEL', 'WARNING'))
@@ -0,0 +1,235 @@
+import os
+import logging
+import collections
+
+from sequencer import sequence as sequence_module
+
+logger = logging.getLogger(__name__)
+
+
+class SequenceBatch(object):
+    '''Applies the same transforms to many sequences at once.
+
+    The batch keeps the start, end, frame count and step of every sequence
+    in columns, and the transforms only update those columns. Frames are
+    recomputed once per sequence, when the sequences are read back, so a
+    chain of transforms costs as much as a single one.
+
+    Every transform accepts either a single value for all the sequences or
+    a list with one value per sequence.
+
+    Example:
+
+        >>> import sequencer
+        >>> import sequencer.batch
+        >>> sequences, extra = sequencer.collect([
+        ...     'sh010.1001.exr', 'sh010.1003.exr',
+        ...     'sh020.0001.exr', 'sh020.0002.exr'])
+        >>> batch = sequencer.batch.SequenceBatch(sequences)
+        >>> batch.make_continuous()
+        >>> batch.set_start(1001)
+        >>> batch.set_padding(4)
+        >>> batch.starts(), batch.ends()
+        ([1001, 1001], [1002, 1002])
+        >>> [x.formatted_frames() for x in batch]
+        [['sh010.1001.exr', 'sh010.1002.exr'],
+         ['sh020.1001.exr', 'sh020.1002.exr']]
+
+    Args:
+        sequences (iter): Sequences to transform. They are changed in place
+            when the batch is read.
+    '''
+
+    def __init__(self, sequences):
+        self._sequences = list(sequences)
+        self._starts = [x.start() for x in self._sequences]
+        self._ends = [x.end() for x in self._sequences]
+        self._counts = [len(x) for x in self._sequences]
+        self._steps = [x.step for x in self._sequences]
+        self._committed_starts = list(self._starts)
+        self._modes = [None] * len(self._sequences)
+        self._dirty = False
+
+    def __len__(self):
+        return len(self._sequences)
+
+    def __iter__(self):
+        self.commit()
+        return iter(self._sequences)
+
+    def __getitem__(self, index):
+        self.commit()
+        return self._sequences[index]
+
+    def _broadcast(self, value):
+        if isinstance(value, (list, tuple)):
+            if len(value) != len(self._sequences):
+                raise ValueError(
+                    'Expected %s values, got %s' % (
+                        len(self._sequences), len(value)))
+            return value
+        return [value] * len(self._sequences)
+
+    def starts(self):
+        '''
+        Returns:
+            list: The start of every sequence.
+        '''
+        return list(self._starts)
+
+    def ends(self):
+        '''
+        Returns:
+            list: The end of every sequence.
+        '''
+        return list(self._ends)
+
+    def offset(self, amount):
+        '''Offsets the sequences by the given amount.
+
+        Args:
+            amount (:obj:`int`, :obj:`list`): The amount to offset the
+                sequences.
+        '''
+        amounts = self._broadcast(amount)
+        self._starts = [x + y for x, y in zip(self._starts, amounts)]
+        self._ends = [x + y for x, y in zip(self._ends, amounts)]
+        self._dirty = True
+
+    def set_start(self, start):
+        '''Shifts the sequences to make their start match the given input.
+
+        Args:
+            start (:obj:`int`, :obj:`list`): Desired start of the sequences.
+        '''
+        starts = self._broadcast(start)
+        self.offset([x - y for x, y in zip(starts, self._starts)])
+
+    def set_end(self, end):
+        '''Shifts the sequences to make their end match the given input.
+
+        Args:
+            end (:obj:`int`, :obj:`list`): Desired end of the sequences.
+        '''
+        ends = self._broadcast(end)
+        self.offset([x - y for x, y in zip(ends, self._ends)])
+
+    def set_padding(self, padding):
+        '''Sets the padding of the sequences.
+
+        Args:
+            padding (:obj:`int`, :obj:`list`): Frame padding.
+        '''
+        for sequence, value in zip(self._sequences, self._broadcast(padding)):
+            sequence.padding = value
+
+    def make_continuous(self):
+        '''Makes the sequences continuous, see
+        :meth:`~sequencer.sequence.Sequence.make_continuous`.
+
+        Raises:
+            ValueError: If a sequence has a forced step some of its frames
+                are not on.
+        '''
+        self._check_steps()
+
+        # Filled sequences are continuous already
+        self._modes = [x or 'continuous' for x in self._modes]
+        self._ends = [
+            x + (y - 1) * z
+            for x, y, z in zip(self._starts, self._counts, self._steps)
+        ]
+        self._dirty = True
+
+    def fill_missing(self):
+        '''Fills the missing frames of the sequences, see
+        :meth:`~sequencer.sequence.Sequence.fill_missing`.
+
+        Raises:
+            ValueError: If a sequence has a forced step some of its frames
+                are not on.
+        '''
+        self._check_steps()
+
+        # Continuous sequences have no missing frames left
+        self._modes = [x or 'fill' for x in self._modes]
+        self._counts = [
+            (y - x) // z + 1
+            for x, y, z in zip(self._starts, self._ends, self._steps)
+        ]
+        self._dirty = True
+
+    def _check_steps(self):
+        # Pending transforms only offset the frames or put them on their
+        # step, so the uncommitted frames can be checked
+        for sequence in self._sequences:
+            sequence._get_fitting_step()
+
+    def commit(self):
+        '''Applies the pending transforms to the sequences. This happens
+        automatically when the sequences of the batch are read.
+        '''
+        if not self._dirty:
+            return
+
+        for index, sequence in enumerate(self._sequences):
+            start = self._starts[index]
+            if self._modes[index]:
+                sequence.frames = range(
+                    start, self._ends[index] + 1, self._steps[index])
+            elif start != self._committed_starts[index]:
+                sequence.offset(start - self._committed_starts[index])
+
+        self._committed_starts = list(self._starts)
+        self._modes = [None] * len(self._sequences)
+        self._dirty = False
+
+    def get_mapping(self):
+        '''Returns the combined mapping of all the sequences, see
+        :meth:`~sequencer.sequence.Sequence.get_mapping`.
+
+        Returns:
+            dict: Ordered dictionary of original and updated paths.
+        '''
+        mapping = collections.OrderedDict()
+        for sequence in self:
+            mapping.update(sequence.get_mapping())
+
+        return mapping
+
+    def stats(self, sizes=False):
+        '''Computes the statistics of all the sequences, see
+        :meth:`~sequencer.sequence.Sequence.stats`.
+
+        Args:
+            sizes (:obj:`bool`, optional): If set, every folder is scanned
+                once for all its sequences to add up the size of their
+                frames.
+
+        Returns:
+            list: A :obj:`~sequencer.sequence.SequenceStats` per sequence.
+        '''
+        sequences = list(self)
+
+        names = []
+        folders = collections.defaultdict(set)
+        if sizes:
+            for sequence in sequences:
+                folder = sequence._get_folder() or os.curdir
+                template = sequence._get_template('name')
+                names.append([template % x for x in sequence.frames])
+                folders[folder].update(names[-1])
+
+        folder_sizes = {
+            x: sequence_module._scan_sizes(x, y) for x, y in folders.items()
+        }
+
+        stats = []
+        for index, sequence in enumerate(sequences):
+            size = None
+            if sizes:
+                found = folder_sizes[sequence._get_folder() or os.curdir]
+                size = sum(found.get(x, 0) for x in names[index])
+            stats.append(sequence._stats(size))
+
+        return stats
@@ -1,5 +1,9 @@
 import re
 import os
+import io
+import mmap
+import heapq
+import tempfile
 import collections
 import logging
 
@@ -13,6 +17,16 @@ try:
 except NameError:  # pragma: no cover
     unicode = str
 
+# Maximum number of non-sequence elements yielded at once by iter_collect
+EXTRA_CHUNK_SIZE = 10000
+
+# Maximum number of run files merged at once by the external sort
+MERGE_FAN_IN = 128
+
+# Read size of every open run file and number of fields of their records
+RUN_BUFFER_SIZE = 64 * 1024
+RUN_FIELDS = 6
+
 COLLECTION_REGEX = re.compile(
     r'(?P<name>\D+?(?P<version>[\.\_]?v\d+)?[\.\_]?)'
     r'(?P<number>\d+)'
@@ -21,11 +35,18 @@ COLLECTION_REGEX = re.compile(
 )
 
 
-def collect(iterable, collection_regex=None, minimum_instances=2):
+def collect(iterable, collection_regex=None, minimum_instances=2,
+            assume_sorted=False, max_items=None, tmpdir=None):
     '''From either an iterable or a file path, attempts to detect all sequenced
     elements within the list and returns them as a
     :obj:`~sequencer.sequence.Sequence` object.
 
+    This function is thread safe: it keeps no state between calls, compiled
+    regular expressions and pattern registries can be shared between
+    threads, and the returned sequences are new objects, owned by the
+    caller. The same applies to :func:`iter_collect` and
+    :func:`collect_manifest`.
+
     Example:
 
         >>> import sequencer
@@ -40,7 +61,9 @@ def collect(iterable, collection_regex=None, minimum_instances=2):
             elements in. If a file path is passed as the argument, it will
             use `os.listdir` of that path as the element list.
         collection_regex (:obj:`str`, optional): If set, it will use the given
-            regular expression to detect sequences in an iterable.
+            regular expression to detect sequences in an iterable. It can
+            also be a :obj:`~sequencer.patterns.PatternRegistry` to detect
+            several naming conventions at once.
 
             .. warning::
 
@@ -49,6 +72,15 @@ def collect(iterable, collection_regex=None, minimum_instances=2):
 
         minimum_instances (:obj:`int`, optional): Minimum number of matches in
             an element to be consider a sequence. Defaults to 2.
+        assume_sorted (:obj:`bool`, optional): If set, the iterable is
+            expected to be sorted by folder and name, so only the current
+            group of elements is kept in memory. See :func:`iter_collect`.
+            Defaults to False.
+        max_items (:obj:`int`, optional): If set, matched elements are
+            sorted on disk in runs of this size, so listings larger than the
+            available memory can be collected. See :func:`iter_collect`.
+        tmpdir (:obj:`str`, optional): Folder for the temporary files used
+            when ``max_items`` is set. Defaults to the system one.
 
     Returns:
         tuple: A tuple with a list of all sequences found in the first index
@@ -58,9 +90,19 @@ def collect(iterable, collection_regex=None, minimum_instances=2):
         extra files are :obj:`str`
 
     '''
+    if assume_sorted or max_items:
+        sequence_objs = []
+        extra = []
+        for sequences, extra_files in iter_collect(
+                iterable, collection_regex, minimum_instances,
+                max_items, tmpdir):
+            sequence_objs.extend(sequences)
+            extra.extend(extra_files)
+        return sequence_objs, extra
+
     # Initial variables
     extra = []
-    sequences = collections.defaultdict(list)
+    sequences = collections.OrderedDict()
     collection_regex = collection_regex or COLLECTION_REGEX
 
     # If it's a path, listdir it
@@ -68,98 +110,496 @@ def collect(iterable, collection_regex=None, minimum_instances=2):
         iterable = os.listdir(iterable)
 
     for item in iterable:
-        folder, item = os.path.split(item)
-        folder = folder or ''
-
-        result = collection_regex.match(item)
+        folder, item, res = _match(item, collection_regex)
 
-        if not result:
+        if res is None:
             extra.append(item)
             continue
 
-        res = result.groupdict()
-        res = {x: _format_nones(y) for x, y in res.items()}
-
         # For a sequence to match, the ony difference must be the number,
         # the only exception to this should be different paddings in the same
         # sequence, but we'll take care of that later.
         sequence_id = folder + res['name'] + res['tail'] + res['ext']
-        sequences[sequence_id].append([item, res, folder])
+        _add(sequences, sequence_id, folder, item, res)
+
+    sequence_objs, digested_extra = _digest(sequences, minimum_instances)
+    extra.extend(digested_extra)
+
+    return sequence_objs, extra
+
+
+def iter_collect(iterable, collection_regex=None, minimum_instances=2,
+                 max_items=None, tmpdir=None):
+    '''Streaming version of :func:`collect` for sorted iterables.
+
+    All the elements sharing folder and name are expected to be contiguous
+    in the iterable, which is the case for listings sorted by folder first
+    and by name second, as in ``sorted(paths, key=os.path.split)``. Every
+    time the folder or the name of the elements changes, the current group
+    is digested and yielded, so only one group is held in memory at any
+    given time. This makes it possible to collect from arbitrarily large
+    listings, such as a manifest file read line by line.
+
+    Listings sorted as plain paths, like the output of ``sort`` or
+    ``find | sort``, don't always qualify: ``/x/a10/f.1.jpg`` sorts between
+    ``/x/a1.jpg`` and ``/x/a2.jpg``. A warning is logged the first time an
+    element's folder and name sort before the previous element's.
+
+    Non-sequence elements are yielded as soon as their group finishes, or
+    in chunks of :data:`EXTRA_CHUNK_SIZE` elements (``max_items`` if set)
+    when there are many of them in a row.
+
+    Example:
+
+        >>> import sequencer
+        >>> items = ['bar.1.jpg', 'bar.2.jpg', 'foo.1.jpg', 'foo.2.jpg']
+        >>> for sequences, extra in sequencer.iter_collect(items):
+        ...     print(sequences)
+        ...
+        [<sequencer.sequence.Sequence "bar.%d.jpg" [1-2]>]
+        [<sequencer.sequence.Sequence "foo.%d.jpg" [1-2]>]
+
+    Unsorted iterables that don't fit in memory can be collected by setting
+    ``max_items``: matched elements are sorted in memory in runs of that
+    size, written to temporary files and merged back in order. Memory is
+    then bounded by ``max_items`` matched elements, plus a read buffer of
+    :data:`RUN_BUFFER_SIZE` bytes for each of the up to
+    :data:`MERGE_FAN_IN` run files merged at once, plus the frame numbers
+    of the biggest sequence.
+
+    .. warning::
+
+        If the iterable is not sorted by folder and name and ``max_items``
+        is not set, a sequence may be split in several
+        :obj:`~sequencer.sequence.Sequence` objects, or some of its elements
+        reported as extra files.
+
+    Args:
+        iterable (:obj:`iter`, :obj:`str`): Iterable sorted by folder and
+            name to detect sequenced elements in. If a file path is passed
+            as the argument, it will use the sorted `os.listdir` of that
+            path.
+        collection_regex (:obj:`str`, optional): Same as in :func:`collect`.
+        minimum_instances (:obj:`int`, optional): Same as in :func:`collect`.
+        max_items (:obj:`int`, optional): If set, the iterable doesn't need
+            to be sorted, and it's sorted on disk in runs of this size. It
+            bounds the number of matched elements held at once, not the
+            memory used while merging the runs, see above.
+        tmpdir (:obj:`str`, optional): Folder for the temporary run files.
+            Defaults to the system one.
+
+    Yields:
+        tuple: A tuple with the list of sequences of the finished group in
+        the first index and a list of the non-sequence files found since the
+        previous group in the second index.
+    '''
+    collection_regex = collection_regex or COLLECTION_REGEX
+
+    # If it's a path, listdir it
+    if isinstance(iterable, (str, unicode)) and os.path.isdir(iterable):
+        iterable = sorted(os.listdir(iterable))
+
+    if max_items:
+        matches = _external_sort(iterable, collection_regex, max_items, tmpdir)
+    else:
+        matches = (_match(x, collection_regex) for x in iterable)
+
+    extra = []
+    extra_size = max_items or EXTRA_CHUNK_SIZE
+    group = collections.OrderedDict()
+    group_id = None
+
+    # Only the previous folder and name are kept to detect iterables that
+    # are not sorted by them, warning once. Externally sorted matches are
+    # sorted by tail too, so they are not checked
+    check_order = not max_items
+    previous = None
+
+    for folder, item, res in matches:
+        if check_order:
+            key = (folder, item)
+            if previous is not None and key < previous:
+                logger.warning(
+                    '"%s" found after "%s", the iterable is not sorted by '
+                    'folder and name', os.path.join(*key),
+                    os.path.join(*previous))
+                check_order = False
+            previous = key
+
+        if res is None:
+            extra.append(item)
+
+            # Keep the memory bounded when there are many extra elements
+            if len(extra) >= extra_size:
+                yield [], extra
+                extra = []
+            continue
+
+        # Elements of the same folder and name can still have different
+        # tails, so they are kept in subgroups until the run finishes
+        run_id = folder + res['name']
+        if run_id != group_id:
+            if group or extra:
+                sequence_objs, digested_extra = _digest(
+                    group, minimum_instances)
+                yield sequence_objs, extra + digested_extra
+
+            extra = []
+            group = collections.OrderedDict()
+            group_id = run_id
+
+        sequence_id = run_id + res['tail'] + res['ext']
+        _add(group, sequence_id, folder, item, res)
+
+    if group or extra:
+        sequence_objs, digested_extra = _digest(group, minimum_instances)
+        yield sequence_objs, extra + digested_extra
+
+
+def collect_manifest(path, collection_regex=None, minimum_instances=2,
+                     encoding='utf-8'):
+    '''Detects the sequences listed in a manifest file, a text file with one
+    path per line, such as the output of ``find`` or an asset database dump.
+
+    The file is memory mapped and scanned as bytes, so the lines are never
+    loaded as a list nor decoded one by one; only the heads, tails and
+    folders of the resulting sequences and the non-sequence elements are
+    decoded. Only the frame numbers of each sequence are kept while
+    scanning, not the lines themselves.
+
+    Example:
+
+        >>> import sequencer
+        >>> sequences, extra = sequencer.collect_manifest('manifest.txt')
+        >>> sequences[0].format()
+        '/shots/sh010/beauty.%04d.exr'
+
+    Args:
+        path (str): Path to the manifest file.
+        collection_regex (:obj:`str`, optional): Same as in :func:`collect`.
+            Text regular expressions are converted to bytes.
+        minimum_instances (:obj:`int`, optional): Same as in :func:`collect`.
+        encoding (:obj:`str`, optional): Encoding of the manifest file.
+            Defaults to ``utf-8``.
+
+    Returns:
+        tuple: Same as :func:`collect`.
+    '''
+    extra = []
+    sequences = collections.OrderedDict()
+    collection_regex = _bytes_regex(
+        collection_regex or COLLECTION_REGEX, encoding)
+
+    with open(path, 'rb') as manifest:
+        try:
+            data = mmap.mmap(manifest.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            return [], []
+
+        try:
+            for line in iter(data.readline, b''):
+                line = line.rstrip(b'\r\n')
+                if not line:
+                    continue
+
+                folder, item, res = _match(line, collection_regex)
+
+                if res is None:
+                    extra.append(item)
+                    continue
+
+                sequence_id = folder + res['name'] + res['tail'] + res['ext']
+                _add(sequences, sequence_id, folder, item, res)
+        finally:
+            data.close()
+
+    sequence_objs, digested_extra = _digest(
+        sequences, minimum_instances, encoding)
+    extra = [x.decode(encoding) for x in extra] + digested_extra
+
+    return sequence_objs, extra
+
+
+def _external_sort(iterable, collection_regex, max_items, tmpdir):
+    '''Matches the elements of the iterable and sorts the matched ones by
+    folder, name and tail, spilling sorted runs of ``max_items`` elements to
+    temporary files and merging them.
+
+    At most :data:`MERGE_FAN_IN` run files are open at once. Runs are kept
+    in levels, and every time a level gathers that many runs they are
+    merged into a single run of the next level, so every element is only
+    written again once per level.
+
+    Yields:
+        tuple: Same as :func:`_match`. Non-matching elements are yielded as
+        they are found, before any matching element.
+    '''
+    levels = [[]]
+    buffer_ = []
+
+    try:
+        for item in iterable:
+            folder, item, res = _match(item, collection_regex)
+
+            if res is None:
+                yield folder, item, None
+                continue
+
+            buffer_.append((
+                folder, res['name'], res['tail'], res['ext'], res['number'],
+                item
+            ))
+
+            if len(buffer_) < max_items:
+                continue
+
+            buffer_.sort()
+            levels[0].append(_write_run(buffer_, tmpdir))
+            buffer_ = []
+
+            level = 0
+            while len(levels[level]) >= MERGE_FAN_IN:
+                if level + 1 == len(levels):
+                    levels.append([])
+                levels[level + 1].append(_merge_runs(levels[level], tmpdir))
+                levels[level] = []
+                level += 1
+
+        # The last merge also takes the buffer, so smaller runs are merged
+        # until there is room for it
+        runs = [x for level in levels for x in level]
+        levels = [runs]
+        while len(runs) >= MERGE_FAN_IN:
+            runs[:MERGE_FAN_IN] = [_merge_runs(runs[:MERGE_FAN_IN], tmpdir)]
+
+        buffer_.sort()
+        records = heapq.merge(*([_read_run(x) for x in runs] + [buffer_]))
+
+        for folder, name, tail, ext, number, item in records:
+            res = {'name': name, 'tail': tail, 'ext': ext, 'number': number}
+            yield folder, item, res
+    finally:
+        for level in levels:
+            for path in level:
+                try:
+                    os.remove(path)
+                except OSError:  # pragma: no cover
+                    pass
+
+
+def _merge_runs(paths, tmpdir):
+    '''Merges the given run files into a new one, removing them.'''
+    path = _write_run(heapq.merge(*[_read_run(x) for x in paths]), tmpdir)
+    for run in paths:
+        os.remove(run)
+    del paths[:]
+
+    return path
+
+
+def _write_run(records, tmpdir):
+    '''Writes the sorted records to a temporary file and returns its path.
+
+    Every field is terminated by a null character, which can't be part of a
+    path, so paths with any other character, new lines included, are kept
+    as they are.
+    '''
+    handle, path = tempfile.mkstemp(
+        prefix='sequencer_', suffix='.run', dir=tmpdir)
+    try:
+        with io.open(handle, 'wb') as run:
+            for record in records:
+                run.write(b''.join(
+                    x.encode('utf-8', 'surrogateescape') + b'\0'
+                    for x in record))
+    except BaseException:
+        os.remove(path)
+        raise
+
+    return path
+
+
+def _read_run(path):
+    '''Yields the records of a file written by :func:`_write_run`.
+
+    Records are parsed one field at a time out of a buffer of
+    :data:`RUN_BUFFER_SIZE` bytes, so an open run never holds more than
+    that and the record being read.
+    '''
+    fields = []
+    data = b''
+    position = 0
+    with io.open(path, 'rb', buffering=0) as run:
+        while True:
+            end = data.find(b'\0', position)
+            if end == -1:
+                chunk = run.read(RUN_BUFFER_SIZE)
+                if not chunk:
+                    return
+                data = data[position:] + chunk
+                position = 0
+                continue
+
+            fields.append(
+                data[position:end].decode('utf-8', 'surrogateescape'))
+            position = end + 1
+
+            if len(fields) == RUN_FIELDS:
+                yield tuple(fields)
+                fields = []
+
+
+def _match(item, collection_regex):
+    '''Splits the item in folder and name and matches the name against the
+    collection regex.
+
+    Returns:
+        tuple: Folder, name and the match dictionary, which will be ``None``
+        if the name didn't match.
+    '''
+    # Works for both text and bytes items
+    empty = item[:0]
+    folder, item = os.path.split(item)
+    folder = folder or empty
+
+    result = collection_regex.match(item)
+
+    if not result:
+        return folder, item, None
+
+    res = result.groupdict()
+    res = {x: _format_nones(y, empty) for x, y in res.items()}
+
+    return folder, item, res
+
+
+def _add(sequences, sequence_id, folder, item, res):
+    '''Adds a matched element to its group.
+
+    Groups only keep the folder and match of their first element and the
+    numbers of all of them, as the elements themselves can be rebuilt from
+    those. Elements with text outside the groups of the match are kept as
+    they are, by index.
+    '''
+    group = sequences.get(sequence_id)
+    if group is None:
+        group = sequences[sequence_id] = [folder, res, [], {}]
+
+    number = res['number']
+    if res['name'] + number + res['tail'] + res['ext'] != item:
+        group[3][len(group[2])] = item
+    group[2].append(number)
+
+
+def _items(group, indices):
+    '''Rebuilds the elements of a group added by :func:`_add`.'''
+    _, res, numbers, items = group
+    for index in indices:
+        item = items.get(index)
+        if item is None:
+            item = res['name'] + numbers[index] + res['tail'] + res['ext']
+        yield item
+
+
+def _digest(sequences, minimum_instances, encoding=None):
+    '''Builds the sequence objects from the grouped elements.
+
+    Args:
+        sequences (dict): Sequence ids mapped to the groups built by
+            :func:`_add`.
+        minimum_instances (int): Minimum number of elements per sequence.
+        encoding (str, optional): If set, the elements are bytes and only
+            the parts needed by the sequences and the discarded elements
+            are decoded with it.
+
+    Returns:
+        tuple: List of sequences and list of discarded elements.
+    '''
+    extra = []
 
     # Data digestion
-    deferred_pop = []
-    deferred_add = {}
-    for sequence_id, sequence_items in sequences.items():
+    digested = []
+    deferred_add = []
+    for group in sequences.values():
+        numbers = group[2]
+
+        # Discard condition: less elements than the minimum
+        if len(numbers) < minimum_instances:
+            extra.extend(_items(group, range(len(numbers))))
+            continue
 
         # Check the paddings first
-        all_numbers = [x[1]['number'] for x in sequence_items]
-        is_padded = not all([len(str(int(x))) == len(x) for x in all_numbers])
-        all_paddings = set([len(x) for x in all_numbers])
+        is_padded = not all([len(str(int(x))) == len(x) for x in numbers])
+        all_paddings = set([len(x) for x in numbers])
 
         # If it's padded but the paddings are different, we need to split in
-        # subsequences
+        # subsequences, one per padding
         if is_padded and len(all_paddings) > 1:
-            subsequences = {}
-
-            # All subsequences will have their original ID + the padding,
-            # which should be enough to make them unique
-            for item, result, folder in sequence_items:
-                key = str(len(result['number']))
-                if key not in subsequences:
-                    subsequences[key] = []
+            subsequences = collections.OrderedDict()
+            for index, number in enumerate(numbers):
+                subsequences.setdefault(len(number), []).append(index)
 
-                subsequences[key].append([item, result, folder, int(key)])
-
-            for subsequence, data in subsequences.items():
+            for padding, indices in subsequences.items():
                 # Since we are a bit out of the loop here, the minimum check
                 # has to be repeated here as well
-                if len(data) < minimum_instances:
-                    [extra.append(x[0]) for x in data]
+                if len(indices) < minimum_instances:
+                    extra.extend(_items(group, indices))
                     continue
 
-                deferred_add[sequence_id + subsequence] = data
-
-            deferred_pop.append(sequence_id)
+                deferred_add.append(
+                    (group, [int(numbers[x]) for x in indices], padding))
 
         # If all paddings match, put the padding
         elif len(all_paddings) == 1:
-            for i, _ in enumerate(sequence_items):
-                sequences[sequence_id][i].append(int(list(all_paddings)[0]))
+            digested.append(
+                (group, [int(x) for x in numbers], all_paddings.pop()))
 
         # If they don't we can assume they are not padded
         else:
-            for i, _ in enumerate(sequence_items):
-                sequences[sequence_id][i].append(None)
-
-        # Discard condition: less elements than the minimum
-        if len(sequence_items) < minimum_instances:
-            [extra.append(x[0]) for x in sequence_items]
-            deferred_pop.append(sequence_id)
-
-    # You shall not delete indices on an iterable while iterating it
-    for pop in deferred_pop:
-        sequences.pop(pop)
-
-    # Nor add them
-    sequences.update(deferred_add)
+            digested.append((group, [int(x) for x in numbers], None))
 
     # And we can now build the sequences
     sequence_objs = []
-    for sequence_id, sequence_items in sequences.items():
-        original, data, folder, padding = sequence_items[0]
-        frames = [int(x[1]['number']) for x in sequence_items]
+    for group, frames, padding in digested + deferred_add:
+        folder, data = group[:2]
+
+        head = data['name']
+        tail = data['tail'] + data['ext']
+        if encoding:
+            head = head.decode(encoding)
+            tail = tail.decode(encoding)
+            folder = folder.decode(encoding)
 
         sequence_ = sequence.Sequence(
-            head=data['name'],
+            head=head,
             frames=set(frames),
             padding=padding,
-            tail=data['tail'] + data['ext'],
+            tail=tail,
             folder=folder
         )
         sequence_objs.append(sequence_)
 
+    if encoding:
+        extra = [x.decode(encoding) for x in extra]
+
     return sequence_objs, extra
 
 
-def _format_nones(item):
-    return '' if item is None else item
+def _bytes_regex(collection_regex, encoding):
+    '''Returns a bytes version of the given compiled regular expression.'''
+    # Pattern registries
+    if hasattr(collection_regex, 'to_bytes'):
+        return collection_regex.to_bytes(encoding)
+
+    if isinstance(collection_regex.pattern, bytes):
+        return collection_regex
+
+    return re.compile(
+        collection_regex.pattern.encode(encoding),
+        collection_regex.flags & ~re.UNICODE
+    )
+
+
+def _format_nones(item, empty=''):
+    return empty if item is None else item
@@ -0,0 +1,138 @@
+import os
+import mmap
+import hashlib
+import logging
+import functools
+import collections
+
+logger = logging.getLogger(__name__)
+
+# Optional, much faster than any of the hashlib algorithms
+try:
+    import xxhash
+except ImportError:  # pragma: no cover
+    xxhash = None
+
+BUFFER_SIZE = 1024 * 1024
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+
+def new(algorithm='md5'):
+    '''Returns a new hash object for the given algorithm.
+
+    Args:
+        algorithm (:obj:`str`, optional): Any algorithm supported by
+            ``hashlib`` or, if the ``xxhash`` module is installed, any of its
+            algorithms (``xxh32``, ``xxh64``, ``xxh3_64``, ``xxh128``...).
+            Defaults to ``md5``.
+
+    Returns:
+        object: The hash object.
+    '''
+    if algorithm.startswith('xxh'):
+        if xxhash is None:
+            raise ValueError(
+                'The xxhash module is needed for "%s"' % algorithm)
+        return getattr(xxhash, algorithm)()
+
+    return hashlib.new(algorithm)
+
+
+def file_digest(path, algorithm='md5'):
+    '''Hashes the contents of a file.
+
+    Small files are read in large buffers, and files bigger than
+    :data:`MMAP_THRESHOLD` are memory mapped and hashed in one go. Both
+    ``hashlib`` and ``xxhash`` release the GIL while hashing, so this can
+    run in several threads at once.
+
+    Args:
+        path (str): Path to the file.
+        algorithm (:obj:`str`, optional): See :func:`new`.
+
+    Returns:
+        str: Hexadecimal digest of the file.
+    '''
+    hasher = new(algorithm)
+
+    with open(path, 'rb') as file_:
+        size = os.fstat(file_.fileno()).st_size
+
+        if size >= MMAP_THRESHOLD:
+            data = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                hasher.update(data)
+            finally:
+                data.close()
+        else:
+            for chunk in iter(functools.partial(file_.read, BUFFER_SIZE), b''):
+                hasher.update(chunk)
+
+    return hasher.hexdigest()
+
+
+def digests(paths, algorithm='md5', workers=None):
+    '''Hashes the given files, concurrently if ``workers`` is given.
+
+    Args:
+        paths (iter): Paths to the files.
+        algorithm (:obj:`str`, optional): See :func:`new`.
+        workers (:obj:`int`, optional): If set, number of threads hashing
+            files at the same time.
+
+    Yields:
+        tuple: The path and its digest, in the order of the paths. The digest
+        is ``None`` if the file could not be read.
+    '''
+    def digest(path):
+        try:
+            return path, file_digest(path, algorithm)
+        except (IOError, OSError) as e:
+            logger.debug('Could not hash "%s": %s', path, e)
+            return path, None
+
+    if not workers or workers < 2:
+        for path in paths:
+            yield digest(path)
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(digest, paths):
+            yield result
+
+
+def write_manifest(path, digests):
+    '''Writes a checksum manifest in the format used by ``md5sum``, which
+    can be checked with ``md5sum -c`` for the md5 algorithm.
+
+    Args:
+        path (str): Path to the manifest file.
+        digests (iter): Iterable of ``(name, digest)`` tuples.
+    '''
+    with open(path, 'w') as manifest:
+        for name, digest in digests:
+            manifest.write('%s  %s\n' % (digest, name))
+
+
+def read_manifest(path):
+    '''Reads a checksum manifest written by :func:`write_manifest`.
+
+    Args:
+        path (str): Path to the manifest file.
+
+    Returns:
+        dict: Ordered dictionary of names and digests.
+    '''
+    manifest = collections.OrderedDict()
+    with open(path) as lines:
+        for line in lines:
+            line = line.rstrip('\r\n')
+            if not line:
+                continue
+            # Text mode entries use two spaces, binary ones a space and "*"
+            digest, name = line.split(' ', 1)
+            manifest[name[1:]] = digest
+
+    return manifest
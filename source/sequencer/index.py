@@ -0,0 +1,192 @@
+import os
+import logging
+import collections
+
+from sequencer import collector
+
+logger = logging.getLogger(__name__)
+
+
+class SequenceIndex(object):
+    '''Index of sequences to find which sequence, and which frame of it, a
+    file path belongs to.
+
+    Sequences are keyed on their folder, head, padding and tail, so a lookup
+    is a couple of dictionary accesses plus a check of the frame in the
+    sequence, no matter how many sequences are indexed.
+
+    .. warning::
+
+        The key of a sequence is taken when it is added. If the head, tail,
+        padding or folder of an indexed sequence change, remove it before
+        the change and add it again after it.
+
+    Example:
+
+        >>> import sequencer
+        >>> import sequencer.index
+        >>> sequences, extra = sequencer.collect(['/foo/bar.01.jpg',
+        ...                                       '/foo/bar.02.jpg'])
+        >>> index = sequencer.index.SequenceIndex(sequences)
+        >>> index.lookup('/foo/bar.02.jpg')
+        (<sequencer.sequence.Sequence "/foo/bar.%02d.jpg" [1-2]>, 2)
+        >>> index.lookup('/foo/bar.03.jpg') is None
+        True
+
+    Args:
+        sequences (:obj:`iter`, optional): Sequences to index.
+        collection_regex (:obj:`str`, optional): Regular expression used to
+            split the looked up paths, same as in
+            :func:`~sequencer.collector.collect`. It should be the same used
+            to collect the sequences.
+    '''
+
+    def __init__(self, sequences=None, collection_regex=None):
+        self._regex = collection_regex or collector.COLLECTION_REGEX
+        self._sequences = {}
+        self._folders = collections.defaultdict(collections.OrderedDict)
+
+        if sequences:
+            self.update(sequences)
+
+    def __len__(self):
+        return len(self._sequences)
+
+    def __iter__(self):
+        return iter(self._sequences.values())
+
+    def __contains__(self, sequence):
+        return self._sequences.get(self.key(sequence)) is sequence
+
+    @staticmethod
+    def key(sequence):
+        '''
+        Args:
+            sequence (:obj:`~sequencer.sequence.Sequence`): Any sequence.
+
+        Returns:
+            tuple: The key of the sequence in the index, in the form of
+            ``(folder, head, padding, tail)``.
+        '''
+        return (
+            _folder_key(sequence.folder),
+            sequence.head,
+            sequence.padding,
+            sequence.tail
+        )
+
+    def add(self, sequence):
+        '''Adds a sequence to the index, replacing any sequence with the same
+        key.
+
+        Args:
+            sequence (:obj:`~sequencer.sequence.Sequence`): Sequence to add.
+        '''
+        key = self.key(sequence)
+        self._sequences[key] = sequence
+        self._folders[key[0]][key] = sequence
+
+    def update(self, sequences):
+        '''Adds several sequences to the index.
+
+        Args:
+            sequences (iter): Sequences to add.
+        '''
+        for sequence in sequences:
+            self.add(sequence)
+
+    def remove(self, sequence):
+        '''Removes a sequence from the index.
+
+        Args:
+            sequence (:obj:`~sequencer.sequence.Sequence`): Sequence to
+                remove.
+
+        Raises:
+            KeyError: If the sequence is not in the index.
+        '''
+        key = self.key(sequence)
+        self._sequences.pop(key)
+
+        folder = self._folders[key[0]]
+        folder.pop(key)
+        if not folder:
+            self._folders.pop(key[0])
+
+    def difference_update(self, sequences):
+        '''Removes several sequences from the index, ignoring the ones not in
+        it.
+
+        Args:
+            sequences (iter): Sequences to remove.
+        '''
+        for sequence in sequences:
+            if sequence in self:
+                self.remove(sequence)
+
+    def lookup(self, path):
+        '''Finds the sequence and frame a path belongs to.
+
+        Args:
+            path (str): Path to a file.
+
+        Returns:
+            tuple: The :obj:`~sequencer.sequence.Sequence` and the frame, or
+            ``None`` if the path is not part of any indexed sequence.
+        '''
+        folder, _, res = collector._match(path, self._regex)
+        if res is None:
+            return None
+
+        folder = _folder_key(folder)
+        tail = res['tail'] + res['ext']
+        number = res['number']
+        frame = int(number)
+
+        # Unpadded numbers can belong to a sequence with any padding up to
+        # their length, padded numbers only to one
+        if len(str(frame)) != len(number):
+            paddings = [len(number)]
+        else:
+            paddings = list(range(len(number), 1, -1)) + [None]
+
+        for padding in paddings:
+            sequence = self._sequences.get(
+                (folder, res['name'], padding, tail))
+            if sequence is None:
+                continue
+
+            if frame in sequence:
+                return sequence, frame
+
+        return None
+
+    def find(self, folder, prefix=''):
+        '''Returns the sequences of a folder.
+
+        Args:
+            folder (str): Folder of the sequences.
+            prefix (:obj:`str`, optional): If set, only the sequences whose
+                head starts with it are returned.
+
+        Returns:
+            list: List of :obj:`~sequencer.sequence.Sequence` objects.
+        '''
+        sequences = self._folders.get(_folder_key(folder), {})
+        return [
+            sequence for key, sequence in sequences.items()
+            if key[1].startswith(prefix)
+        ]
+
+    def folders(self):
+        '''
+        Returns:
+            list: All the folders with indexed sequences.
+        '''
+        return list(self._folders)
+
+
+def _folder_key(folder):
+    if not folder:
+        return ''
+    return os.path.normpath(folder.replace('\\', os.sep))
@@ -0,0 +1,229 @@
+import bisect
+import logging
+import itertools
+import collections
+
+from sequencer import sequence
+
+logger = logging.getLogger(__name__)
+
+
+class MergedSequence(sequence.Sequence):
+    '''Sequence assembled from several sequences sharing head, padding and
+    tail, usually the same sequence split across different folders.
+
+    On top of the :obj:`~sequencer.sequence.Sequence` attributes, it knows
+    where each of its frames comes from:
+
+    * sources: Sorted list of ``(start, end, folder)`` tuples with the \
+        folder of every range of frames.
+    * duplicates: Sorted list of ``(start, end, folder)`` tuples with the \
+        ranges of frames found again in another folder, which were ignored.
+
+    When the sequence has a step, the ranges only hold the frames on it, so
+    ``(1, 99, folder)`` means frames 1, 3, 5... 99 for a step of 2.
+
+    The merged sequence has no folder by default, so :meth:`get_mapping`
+    gathers every frame from its source folder into the current directory,
+    or into :attr:`folder` if it's set.
+
+    Args:
+        head (str): Head of the sequence
+        frames (list): List of frames the sequence contains
+        padding (int): Frame padding
+        tail (str): Tail of the sequence
+        sources (list): Ranges of frames and their folders.
+        duplicates (:obj:`list`, optional): Ranges of duplicated frames.
+        folder (:obj:`str`, optional): Folder of the merged sequence.
+        step (:obj:`int`, optional): Step of the sequence and of its ranges.
+    '''
+
+    def __init__(self, head, frames, padding, tail, sources,
+                 duplicates=None, folder=None, step=None):
+        super(MergedSequence, self).__init__(
+            head, frames, padding, tail, folder, step)
+        self.sources = sources
+        self.duplicates = duplicates or []
+        self._source_starts = [x[0] for x in sources]
+        self._source_step = step or 1
+
+    def source(self, frame):
+        '''
+        Args:
+            frame (int): Original frame of the sequence.
+
+        Returns:
+            str: The folder the frame comes from, or ``None`` if no folder
+            has it.
+        '''
+        index = bisect.bisect_right(self._source_starts, frame) - 1
+        if index < 0 or frame > self.sources[index][1]:
+            return None
+
+        # Ranges of stepped sequences only hold the frames on their step
+        start, _, folder = self.sources[index]
+        if (frame - start) % self._source_step:
+            return None
+        return folder
+
+    def _get_orig_path(self, number):
+        folder = self.source(number)
+        if folder is None:
+            return super(MergedSequence, self)._get_orig_path(number)
+
+        return sequence._format_folder(folder) \
+            + self._get_template('orig_name') % number
+
+
+def merge(sequences):
+    '''Merges the sequences sharing head, padding and tail, regardless of
+    their folder, into :obj:`MergedSequence` objects.
+
+    Frames are handled as the evenly spaced runs the sequences store, so
+    the work depends on the number of runs and not on the number of frames,
+    including sequences with a step. Runs with a bigger step than the rest
+    of the sequences, or not aligned with them, are handled frame by frame.
+    When a frame is in several folders, the first sequence given wins and
+    the rest are reported as duplicates.
+
+    Example:
+
+        >>> import sequencer
+        >>> import sequencer.merge
+        >>> sequences, extra = sequencer.collect([
+        ...     '/farm/a/beauty.0001.exr', '/farm/a/beauty.0002.exr',
+        ...     '/farm/b/beauty.0002.exr', '/farm/b/beauty.0003.exr'])
+        >>> merged = sequencer.merge.merge(sequences)
+        >>> merged
+        [<sequencer.sequence.MergedSequence "beauty.%04d.exr" [1-3]>]
+        >>> merged[0].sources
+        [(1, 2, '/farm/a'), (3, 3, '/farm/b')]
+        >>> merged[0].duplicates
+        [(2, 2, '/farm/b')]
+
+    Args:
+        sequences (iter): Sequences to merge.
+
+    Returns:
+        list: List of :obj:`MergedSequence` objects, one per head, padding
+        and tail.
+    '''
+    groups = collections.OrderedDict()
+    for sequence_ in sequences:
+        key = (sequence_.head, sequence_.padding, sequence_.tail)
+        groups.setdefault(key, []).append(sequence_)
+
+    merged = []
+    for (head, padding, tail), group in groups.items():
+        runs = [
+            (start, end, step, sequence_.folder or '')
+            for sequence_ in group
+            for start, end, step in sequence_._get_runs()
+        ]
+        base, step = _grid(runs)
+
+        # Ranges are merged as positions in the grid of frames, where the
+        # runs with the step of the grid are continuous
+        sources = []
+        duplicates = []
+        for start, end, run_step, folder in runs:
+            for x, y in _positions(start, end, run_step, base, step):
+                pieces, overlaps = _subtract(sources, x, y)
+                duplicates.extend((x, y, folder) for x, y in overlaps)
+                for x, y in pieces:
+                    bisect.insort(sources, (x, y, folder))
+
+        sources = _join(sources)
+        frames = [
+            sequence._range(x, y + 1, step)
+            for x, y, _ in _to_frames(_join(sources, folders=False), base,
+                                      step)
+        ]
+
+        # Only a single range of frames stays compact in the sequence
+        if len(frames) != 1:
+            frames = itertools.chain.from_iterable(frames)
+        else:
+            frames = frames[0]
+
+        merged.append(MergedSequence(
+            head=head,
+            frames=frames,
+            padding=padding,
+            tail=tail,
+            sources=_to_frames(sources, base, step),
+            duplicates=_to_frames(_join(sorted(duplicates)), base, step),
+            step=step if step > 1 else None
+        ))
+
+    return merged
+
+
+def _grid(runs):
+    '''Returns the first frame and the step of the coarsest grid holding
+    every frame of the runs.'''
+    if not runs:
+        return 0, 1
+
+    base = min(x[0] for x in runs)
+    step = 0
+    for start, end, run_step, _ in runs:
+        step = sequence.gcd(step, start - base)
+        if end > start:
+            step = sequence.gcd(step, run_step)
+
+    return base, step or 1
+
+
+def _positions(start, end, run_step, base, step):
+    '''Returns the ranges of grid positions of a run. Runs with a bigger
+    step than the grid have gaps in it, so each frame is its own range.'''
+    if run_step == step or start == end:
+        return [((start - base) // step, (end - base) // step)]
+
+    return [((x - base) // step,) * 2
+            for x in sequence._range(start, end + 1, run_step)]
+
+
+def _subtract(ranges, start, end):
+    '''Splits a range in the pieces not covered by the given sorted, disjoint
+    ranges and the pieces overlapping them.'''
+    pieces = []
+    overlaps = []
+
+    index = bisect.bisect_right(ranges, (start,))
+    if index and ranges[index - 1][1] >= start:
+        index -= 1
+
+    current = start
+    while index < len(ranges) and ranges[index][0] <= end:
+        range_start, range_end = ranges[index][:2]
+        if range_start > current:
+            pieces.append((current, range_start - 1))
+        overlaps.append((max(current, range_start), min(end, range_end)))
+        current = range_end + 1
+        index += 1
+
+    if current <= end:
+        pieces.append((current, end))
+
+    return pieces, overlaps
+
+
+def _join(ranges, folders=True):
+    '''Joins consecutive ranges of the same folder, or of any folder if
+    ``folders`` is not set.'''
+    joined = []
+    for start, end, folder in ranges:
+        if joined and joined[-1][1] + 1 == start and \
+                (not folders or joined[-1][2] == folder):
+            joined[-1] = (joined[-1][0], end, joined[-1][2])
+        else:
+            joined.append((start, end, folder))
+    return joined
+
+
+def _to_frames(ranges, base, step):
+    '''Converts ranges of grid positions back to frames.'''
+    return [(base + x * step, base + y * step, folder)
+            for x, y, folder in ranges]
@@ -0,0 +1,290 @@
+import re
+import logging
+import itertools
+
+from sequencer import collector
+
+logger = logging.getLogger(__name__)
+
+# Frame tokens of the templates and the regular expression of their number
+TEMPLATE_TOKEN = re.compile(
+    r'(?P<hashes>#+)'
+    r'|(?P<ats>@+)'
+    r'|%(?:0(?P<printf>\d+))?d'
+    r'|\$F(?P<houdini>\d*)'
+    r'|(?P<udim><UDIM>)'
+)
+
+_GROUP = re.compile(r'\(\?P([<=])(\w+)')
+
+# Flags that can be scoped to a single pattern, as in "(?i:...)"
+_SCOPED_FLAGS = [
+    (re.IGNORECASE, 'i'),
+    (re.MULTILINE, 'm'),
+    (re.DOTALL, 's'),
+    (re.VERBOSE, 'x'),
+]
+
+
+def from_template(template):
+    '''Builds a regular expression usable by the collector from a naming
+    template with a single frame token.
+
+    Supported frame tokens:
+
+    * ``#``, ``@``: One per digit of padding, as in ``beauty.####.exr``.
+    * ``%d``, ``%04d``: Printf style, as in ``beauty.%04d.exr``.
+    * ``$F``, ``$F4``: Houdini style, as in ``beauty.$F4.exr``.
+    * ``<UDIM>``: Four digit UDIM tiles, as in ``diffuse.<UDIM>.tif``.
+
+    Everything else is literal but ``*``, which matches any text.
+
+    Example:
+
+        >>> import re
+        >>> import sequencer.patterns
+        >>> regex = sequencer.patterns.from_template('*.####.exr')
+        >>> re.match(regex, 'sh010_beauty.1001.exr').group('name')
+        'sh010_beauty.'
+
+    Args:
+        template (str): Naming template.
+
+    Returns:
+        str: Regular expression with the ``name``, ``number``, ``tail`` and
+        ``ext`` groups.
+
+    Raises:
+        ValueError: If the template doesn't have exactly one frame token.
+    '''
+    tokens = list(TEMPLATE_TOKEN.finditer(template))
+    if len(tokens) != 1:
+        raise ValueError(
+            'Template "%s" must have exactly one frame token' % template)
+
+    token = tokens[0]
+    if token.group('udim'):
+        number = r'\d{4}'
+    else:
+        width = token.group('hashes') or token.group('ats')
+        width = len(width) if width else int(
+            token.group('printf') or token.group('houdini') or 1)
+        number = r'\d{%d,}' % width if width > 1 else r'\d+'
+
+    def literal(text):
+        return '.*?'.join(re.escape(x) for x in text.split('*'))
+
+    return '(?P<name>%s)(?P<number>%s)(?P<tail>%s)(?P<ext>)$' % (
+        literal(template[:token.start()]),
+        number,
+        literal(template[token.end():])
+    )
+
+
+class PatternMatch(object):
+    '''Result of :meth:`PatternRegistry.match`, usable as the match of a
+    regular expression by the collector.
+
+    Args:
+        pattern (str): Name of the matching pattern.
+        groups (dict): Groups of the matching pattern.
+    '''
+
+    def __init__(self, pattern, groups):
+        self.pattern = pattern
+        self._groups = groups
+
+    def group(self, name):
+        return self._groups[name]
+
+    def groupdict(self):
+        return dict(self._groups)
+
+
+class PatternRegistry(object):
+    '''Set of naming conventions compiled into a single regular expression,
+    so a listing with several conventions is collected in one pass. It can
+    be given to :func:`~sequencer.collector.collect` as the
+    ``collection_regex``.
+
+    Patterns are tried from the highest priority to the lowest, and in
+    registration order for the same priority. The first pattern matching a
+    name wins.
+
+    Example:
+
+        >>> import sequencer
+        >>> import sequencer.patterns
+        >>> registry = sequencer.patterns.PatternRegistry()
+        >>> registry.register_template('dotted', '*.####.*', priority=10)
+        >>> sequences, extra = sequencer.collect(
+        ...     ['sh010_beauty.1001.exr', 'sh010_beauty.1002.exr',
+        ...      'weta01.jpg', 'weta02.jpg'],
+        ...     collection_regex=registry)
+        >>> [x.format() for x in sequences]
+        ['sh010_beauty.%04d.exr', 'weta%02d.jpg']
+
+    .. warning::
+
+        Patterns can't use global inline flags, such as ``(?i)``.
+
+    Args:
+        default (:obj:`bool`, optional): Registers the default collection
+            regular expression as the ``default`` pattern, with priority 0.
+            Defaults to True.
+        encoding (:obj:`str`, optional): If set, the patterns are compiled
+            as bytes with it. See :meth:`to_bytes`.
+    '''
+
+    def __init__(self, default=True, encoding=None):
+        self._patterns = []
+        self._encoding = encoding
+        self._counter = itertools.count()
+        self._compiled = None
+
+        if default:
+            self.register('default', collector.COLLECTION_REGEX.pattern)
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def names(self):
+        '''
+        Returns:
+            list: Names of the registered patterns, in matching order.
+        '''
+        return [x[2] for x in sorted(self._patterns)]
+
+    def register(self, name, pattern, priority=0):
+        '''Registers a regular expression.
+
+        Args:
+            name (str): Name of the pattern, which replaces any pattern with
+                the same name.
+            pattern (:obj:`str`, :obj:`re.Pattern`): Regular expression with
+                the same groups required by the collector. The flags of
+                compiled expressions are kept for this pattern only.
+            priority (:obj:`int`, optional): Patterns with higher priority
+                are tried first. Defaults to 0.
+
+        Raises:
+            ValueError: If the compiled expression has flags that can't be
+                limited to the pattern, such as :obj:`re.ASCII`.
+        '''
+        if hasattr(pattern, 'pattern'):
+            pattern = _scope_flags(pattern)
+        self.unregister(name)
+        self._patterns.append((-priority, next(self._counter), name, pattern))
+        self._compiled = None
+
+    def register_template(self, name, template, priority=0):
+        '''Registers a naming template, see :func:`from_template`.
+
+        Args:
+            name (str): Name of the pattern.
+            template (str): Naming template.
+            priority (:obj:`int`, optional): See :meth:`register`.
+        '''
+        self.register(name, from_template(template), priority)
+
+    def unregister(self, name):
+        '''Removes a pattern, if registered.
+
+        Args:
+            name (str): Name of the pattern.
+        '''
+        self._patterns = [x for x in self._patterns if x[2] != name]
+        self._compiled = None
+
+    def to_bytes(self, encoding='utf-8'):
+        '''
+        Args:
+            encoding (:obj:`str`, optional): Encoding of the patterns.
+
+        Returns:
+            PatternRegistry: A copy of the registry matching bytes.
+        '''
+        registry = PatternRegistry(default=False, encoding=encoding)
+        registry._patterns = list(self._patterns)
+        return registry
+
+    def compile(self):
+        '''Builds the combined regular expression. This is done on the first
+        match after any change, but can be forced to fail early on invalid
+        patterns.
+
+        Returns:
+            re.Pattern: The combined regular expression.
+        '''
+        return self._compile()[0]
+
+    def _compile(self):
+        # Compiled data is replaced at once, so concurrent matches never see
+        # a regular expression with the markers of another
+        compiled = self._compiled
+        if compiled is not None:
+            return compiled
+
+        alternatives = []
+        markers = []
+        for index, (_, _, name, pattern) in enumerate(sorted(self._patterns)):
+            # Group names must be unique in the combined expression
+            suffix = '__%d' % index
+            groups = [(x + suffix, x) for x in re.compile(pattern).groupindex]
+            pattern = _GROUP.sub(r'(?P\1\2%s' % suffix, pattern)
+
+            marker = '_pattern%d' % index
+            alternatives.append('(?P<%s>)(?:%s)' % (marker, pattern))
+            markers.append((marker, name, groups))
+
+        combined = '|'.join(alternatives)
+        if self._encoding:
+            combined = combined.encode(self._encoding)
+
+        regex = re.compile(combined)
+        markers = [
+            (regex.groupindex[x], name, groups) for x, name, groups in markers
+        ]
+        self._compiled = compiled = (regex, markers)
+
+        return compiled
+
+    def match(self, item):
+        '''Matches a name against the registered patterns.
+
+        Args:
+            item (str): Name to match.
+
+        Returns:
+            PatternMatch: The match of the first matching pattern or ``None``
+            if none matches.
+        '''
+        regex, markers = self._compile()
+        result = regex.match(item)
+        if not result:
+            return None
+
+        for index, name, groups in markers:
+            if result.start(index) != -1:
+                return PatternMatch(
+                    name, {x: result.group(y) for y, x in groups})
+
+
+def _scope_flags(regex):
+    '''Returns the pattern of a compiled regular expression with its flags
+    scoped to it, so they don't apply to the rest of a combined expression.
+    '''
+    flags = regex.flags & ~re.UNICODE
+    letters = ''
+    for flag, letter in _SCOPED_FLAGS:
+        if flags & flag:
+            letters += letter
+            flags &= ~flag
+
+    if flags:
+        raise ValueError(
+            'Flags of pattern "%s" cannot be scoped to it' % regex.pattern)
+
+    if not letters:
+        return regex.pattern
+    return '(?%s:%s)' % (letters, regex.pattern)
@@ -1,9 +1,42 @@
 import collections
+import bisect
+import itertools
 import os
+import stat
 import logging
 
+from sequencer import hashing
+
 logger = logging.getLogger(__name__)
 
+# Python 3 compatibility
+try:
+    _range = xrange
+except NameError:  # pragma: no cover
+    _range = range
+
+# Python 3.5+ only
+try:
+    from os import scandir
+except ImportError:  # pragma: no cover
+    scandir = None
+
+
+# Python 3.5+ moved gcd to math
+try:
+    from math import gcd
+except ImportError:  # pragma: no cover
+    from fractions import gcd
+
+
+VerifyReport = collections.namedtuple(
+    'VerifyReport', ['missing', 'empty', 'outliers', 'sizes'])
+
+SequenceStats = collections.namedtuple(
+    'SequenceStats',
+    ['count', 'holes', 'missing', 'largest_gap', 'step', 'size']
+)
+
 
 class Sequence(object):
     '''Represents a sequence of elements. The sequence is defined by the
@@ -16,8 +49,19 @@ class Sequence(object):
     * tail: The tail is whatever comes after the number. For example, in \
         ``weta.01.jpg``, it would be ``.jpg``.
     * folder: (optional) folder where the sequence lives.
+    * step: The distance between frames, such as 2 for a sequence \
+        rendered on twos. Detected from the frames unless given.
     * missing: Frames missing in the range between the minimum and maximum \
-        frames.
+        frames, taking the step into account.
+
+    Evenly spaced frames, with or without a step, are stored as a range, so
+    their storage doesn't depend on the number of frames.
+
+    Derived data, such as the sorted frames or the missing frames, is only
+    computed when it's read after a change, so chaining several changes
+    costs as much as the last one. Because of this, a sequence is not
+    thread safe, not even for reading; use :meth:`freeze` to share it
+    between threads.
 
     The :obj:`Sequence` instance also remembers it's original data to easily
     create a mapping from the original to the a sequence.
@@ -55,68 +99,227 @@ class Sequence(object):
         frames (list): List of frames the sequence contains
         padding (int): Frame padding
         tail (str): Tail of the sequence
+        folder (:obj:`str`, optional): Folder of the sequence
+        step (:obj:`int`, optional): Step of the sequence. If not set, it's
+            detected as the greatest common divisor of the distances between
+            frames, for sequences of at least three frames.
     '''
 
-    def __init__(self, head, frames, padding, tail, folder=None):
-        self._frames = []
+    def __init__(self, head, frames, padding, tail, folder=None, step=None):
+        self._templates = {}
 
         self._orig_head = head
-        self._orig_frames = list(sorted(set(frames)))
+        self._orig_frames = _compact(frames)
         self._orig_padding = padding
         self._orig_tail = tail
         self._orig_folder = folder
+        self._orig_step = step
 
         self.head = head
-        self.frames = self._orig_frames
+        self._frames_source = None
+        self._frames = self._orig_frames
+        if not isinstance(self._frames, _range):
+            self._frames = list(self._frames)
+        self._offset = 0
+        self._missing = None
+        self._step = step
+        self._detected_step = None
         padding = padding if padding is not None else 1
         self.padding = padding if padding > 1 else None
         self.tail = tail
-        self.missing = self.find_missing_in_range(frames)
         self.folder = self._orig_folder
 
     @staticmethod
-    def find_missing_in_range(iterable):
+    def find_missing_in_range(iterable, step=1):
         '''Given a range of integers, return any holes in it.
 
         Args:
             iterable (iter): Integer range
+            step (:obj:`int`, optional): Distance between the integers.
+                Defaults to 1.
 
         Returns:
             list: List of missing integers in the sequence
         '''
+        present = set(iterable)
         missing = []
-        for i in range(min(iterable), max(iterable) + 1):
-            if i not in iterable:
+        for i in range(min(present), max(present) + 1, step):
+            if i not in present:
                 missing.append(i)
 
         return missing
 
     def __repr__(self):  # pragma: no cover
-        return '<%s "%s" [%s-%s]>' % (
+        return '<%s "%s" [%s-%s%s]>' % (
             __name__ + '.' + self.__class__.__name__,
             self.format(),
             self.start(),
-            self.end()
+            self.end(),
+            'x%s' % self.step if self.step > 1 else ''
         )
 
+    def __len__(self):
+        return len(self._get_sorted_frames())
+
+    def __contains__(self, frame):
+        frames = self._get_sorted_frames()
+        frame -= self._offset
+        if isinstance(frames, _range):
+            return frame in frames
+
+        index = bisect.bisect_left(frames, frame)
+        return index < len(frames) and frames[index] == frame
+
     def _padding_format(self, orig=False):
         if orig:
             padding = self._orig_padding
         else:
             padding = self.padding
-        if padding:
-            return '%' + str(padding).zfill(2) + 'd'
-        return '%d'
+        return _format_padding(padding)
+
+    @property
+    def head(self):
+        '''Head of the sequence'''
+        return self._head
+
+    @head.setter
+    def head(self, value):
+        self._head = value
+        self._templates.clear()
+
+    @property
+    def padding(self):
+        '''Frame padding'''
+        return self._padding
+
+    @padding.setter
+    def padding(self, value):
+        self._padding = value
+        self._templates.clear()
+
+    @property
+    def tail(self):
+        '''Tail of the sequence'''
+        return self._tail
+
+    @tail.setter
+    def tail(self, value):
+        self._tail = value
+        self._templates.clear()
+
+    @property
+    def folder(self):
+        '''Folder where the sequence lives'''
+        return self._folder
+
+    @folder.setter
+    def folder(self, value):
+        self._folder = value
+        self._templates.clear()
+
+    def _get_template(self, kind):
+        '''Returns the cached templates of the sequence, which are only built
+        again after the head, padding, tail or folder change.
+
+        Kinds of templates:
+
+        * format: Result of :meth:`format`.
+        * path: Normalized path with the ``%`` of the head and tail escaped.
+        * name: File name with the ``%`` of the head and tail escaped.
+        * dest: Path used as destination by :meth:`get_mapping`.
+        * orig_name: Same as ``name`` with the original data.
+        * orig: Same as ``dest`` with the original data.
+        '''
+        template = self._templates.get(kind)
+        if template is not None:
+            return template
+
+        orig = kind.startswith('orig')
+        if orig:
+            head, tail = self._orig_head, self._orig_tail
+        else:
+            head, tail = self.head, self.tail
+
+        if kind == 'format':
+            template = os.path.normpath('%s%s%s%s' % (
+                self._get_folder(), head, self._padding_format(), tail))
+        elif kind == 'path':
+            template = os.path.normpath(
+                self._get_folder().replace('%', '%%') +
+                self._get_template('name'))
+        elif kind in ('name', 'orig_name'):
+            template = head.replace('%', '%%') \
+                + self._padding_format(orig) \
+                + tail.replace('%', '%%')
+        elif kind in ('dest', 'orig'):
+            template = self._get_folder(orig).replace('%', '%%') \
+                + self._get_template('orig_name' if orig else 'name')
+
+        self._templates[kind] = template
+        return template
 
     @property
     def frames(self):
         '''List of frames in the sequence'''
-        return self._frames
+        frames = self._get_sorted_frames()
+        if self._offset:
+            frames = self._frames = _shift(frames, self._offset)
+            self._offset = 0
+
+        # Ranges are only materialized on demand
+        if isinstance(frames, _range):
+            return list(frames)
+        return frames
 
     @frames.setter
     def frames(self, value):
-        self._frames = list(sorted(set(value)))
-        self.missing = self.find_missing_in_range(self._frames)
+        # Sorting is deferred until the frames are read
+        self._frames_source = value if isinstance(value, _range) \
+            else list(value)
+        self._frames = None
+        self._offset = 0
+        self._missing = None
+        self._detected_step = None
+
+    def _get_sorted_frames(self):
+        '''Returns the sorted frames without the pending offset.'''
+        if self._frames is None:
+            self._frames = _compact(self._frames_source)
+            self._frames_source = None
+        return self._frames
+
+    def _get_runs(self):
+        '''Returns the evenly spaced runs of frames, see :func:`_runs`.'''
+        offset = self._offset
+        return [(x + offset, y + offset, z)
+                for x, y, z in _runs(self._get_sorted_frames())]
+
+    @property
+    def step(self):
+        '''Distance between the frames of the sequence'''
+        if self._step:
+            return self._step
+
+        if self._detected_step is None:
+            self._detected_step = _detect_step(self._get_sorted_frames())
+        return self._detected_step
+
+    @step.setter
+    def step(self, value):
+        self._step = value
+        self._missing = None
+
+    @property
+    def missing(self):
+        '''List of frames missing in the range of the sequence'''
+        if self._missing is None:
+            frames = self._get_sorted_frames()
+            step = self.step
+            if isinstance(frames, _range) and _range_step(frames) == step:
+                self._missing = []
+            else:
+                self._missing = self.find_missing_in_range(self.frames, step)
+        return self._missing
 
     def _get_folder(self, orig=False):
         if orig:
@@ -124,9 +327,7 @@ class Sequence(object):
         else:
             folder = self.folder
 
-        if folder:
-            folder = folder.replace('\\', os.sep)
-        return folder + os.sep if folder else ''
+        return _format_folder(folder)
 
     def format(self):
         '''
@@ -134,30 +335,64 @@ class Sequence(object):
             str: The formatted name of the sequence in the form of \
                 ``head%04d.tail``
         '''
-        value = '%s%s%s%s' % (
-            self._get_folder(),
-            self.head,
-            self._padding_format(),
-            self.tail
-        )
-        return os.path.normpath(value)
+        return self._get_template('format')
+
+    def path_for(self, frame):
+        '''
+        Args:
+            frame (int): Any frame.
+
+        Returns:
+            str: The formatted path of the given frame.
+        '''
+        return self._get_template('path') % frame
 
     def formatted_frames(self):
         '''
         Returns:
             list: A list with all frames properly formatted
         '''
-        return [self.format() % x for x in self.frames]
+        template = self._get_template('path')
+        return [template % x for x in self.frames]
 
     def make_continuous(self):
         '''Makes the frame sequence continuous. Shifts all frames in the
-        sequence so all of them are the previous plus one.
+        sequence so all of them are the previous plus the step.
+
+        Raises:
+            ValueError: If the step was forced and some frames are not on it.
         '''
-        self.frames = range(self.start(), (self.end() + 1) - len(self.missing))
+        start = self.start()
+        step = self._get_fitting_step()
+        self.frames = _range(start, start + len(self) * step, step)
 
     def fill_missing(self):
-        '''Fills the missing frames by creating them'''
-        self.frames = range(self.start(), self.end() + 1)
+        '''Fills the missing frames by creating them
+
+        Raises:
+            ValueError: If the step was forced and some frames are not on it,
+                as filling would drop them.
+        '''
+        step = self._get_fitting_step()
+        self.frames = _range(self.start(), self.end() + 1, step)
+
+    def _get_fitting_step(self):
+        '''Returns the step, making sure every frame is on it. Detected steps
+        always are, forced ones may not.'''
+        step = self.step
+        if not self._step:
+            return step
+
+        previous = None
+        for start, end, run_step in self._get_runs():
+            if previous is not None and (start - previous) % step or \
+                    end > start and run_step % step:
+                raise ValueError(
+                    'Frames of "%s" are not on its step of %s' % (
+                        self.format(), step))
+            previous = end
+
+        return step
 
     def reset(self):
         '''Resets the sequence to it's original initialization.'''
@@ -165,20 +400,21 @@ class Sequence(object):
         self.tail = self._orig_tail
         self.frames = self._orig_frames
         self.padding = self._orig_padding
+        self.step = self._orig_step
 
     def start(self):
         '''
         Returns:
             int: The minimum frame within the frame range.
         '''
-        return min(self.frames)
+        return self._get_sorted_frames()[0] + self._offset
 
     def end(self):
         '''
         Returns:
             int: The maximum frame within the frame range.
         '''
-        return max(self.frames)
+        return self._get_sorted_frames()[-1] + self._offset
 
     def offset(self, amount):
         '''Offsets the sequence by the given amount.
@@ -186,7 +422,9 @@ class Sequence(object):
         Args:
             amount (int): The amount to offset the sequence.
         '''
-        self.frames = [x + amount for x in self.frames]
+        # Applied when the frames are read
+        self._offset += amount
+        self._missing = None
 
     def set_start(self, start):
         '''Shifts the sequence to make it's start match the given input.
@@ -206,6 +444,228 @@ class Sequence(object):
         offset = end - self.end()
         self.offset(offset)
 
+    def verify(self, tolerance=0.5, workers=None):
+        '''Checks the frames of the sequence against the disk.
+
+        The folder of the sequence is scanned once with ``os.scandir`` and
+        only the entries matching the expected frame names are stat'ed, so
+        there is no syscall per missing frame. If ``workers`` is given, every
+        frame is stat'ed concurrently instead, which is faster on network
+        filesystems with high latency.
+
+        Frames are reported as outliers when their size differs from the
+        median size of the non-empty frames by more than ``tolerance`` times
+        the median, which usually means partially written files.
+
+        Example:
+
+            >>> import sequencer
+            >>> sequences, extra = sequencer.collect('test/resources/seq_02')
+            >>> sequences[0].folder = 'test/resources/seq_02'
+            >>> sequences[0].verify().missing
+            []
+
+        Args:
+            tolerance (:obj:`float`, optional): Allowed relative size
+                difference from the median. Defaults to 0.5.
+            workers (:obj:`int`, optional): If set, number of threads used to
+                stat the frames individually.
+
+        Returns:
+            VerifyReport: A named tuple with the ``missing``, ``empty`` and
+            ``outliers`` frames and a ``sizes`` dictionary of the size of
+            every existing frame.
+        '''
+        folder = self._get_folder() or os.curdir
+        pattern = self._get_template('name')
+        names = collections.OrderedDict(
+            (pattern % frame, frame) for frame in self.frames)
+
+        if workers:
+            sizes = _stat_sizes(folder, names, workers)
+        else:
+            sizes = _scan_sizes(folder, names)
+
+        sizes = collections.OrderedDict(
+            (frame, sizes[name]) for name, frame in names.items()
+            if name in sizes
+        )
+        missing = [x for x in self.frames if x not in sizes]
+        empty = [x for x, size in sizes.items() if not size]
+
+        outliers = []
+        non_empty = sorted(x for x in sizes.values() if x)
+        if non_empty:
+            median = non_empty[len(non_empty) // 2]
+            outliers = [
+                x for x, size in sizes.items()
+                if size and abs(size - median) > tolerance * median
+            ]
+
+        return VerifyReport(missing, empty, outliers, dict(sizes))
+
+    def stats(self, sizes=False):
+        '''Computes the statistics of the sequence from its evenly spaced
+        runs of frames, so a sequence stored as a range takes constant time
+        and any other one a single pass over its frames.
+
+        A forced step that doesn't fit the frames needs the missing frames
+        to count the gaps, which is an extra pass.
+
+        The step is the greatest common divisor of the distances between
+        frames, so a sequence rendered on twos has a step of 2. Holes and
+        missing frames are counted in steps, so that sequence has no holes.
+
+        Example:
+
+            >>> import sequencer
+            >>> sequence = sequencer.Sequence(
+            ... head='weta.', tail='.jpg', frames=[1, 3, 5, 11, 13],
+            ... padding=3)
+            >>> stats = sequence.stats()
+            >>> stats.step, stats.holes, stats.missing, stats.largest_gap
+            (2, 1, 2, 2)
+
+        Args:
+            sizes (:obj:`bool`, optional): If set, the folder of the sequence
+                is scanned once to add up the size of the frames on disk.
+
+        Returns:
+            SequenceStats: A named tuple with the frame ``count``, the number
+            of ``holes`` and ``missing`` frames, the ``largest_gap`` in
+            frames, the ``step`` and the total ``size`` in bytes, which is
+            ``None`` unless ``sizes`` is set.
+        '''
+        size = None
+        if sizes:
+            folder = self._get_folder() or os.curdir
+            names = set(self._get_template('name') % x for x in self.frames)
+            size = sum(_scan_sizes(folder, names).values())
+
+        return self._stats(size)
+
+    def _stats(self, size=None):
+        # Distances between consecutive frames, taken from the evenly spaced
+        # runs of frames, so ranges are never expanded
+        count = 0
+        distances = collections.Counter()
+        previous = None
+        for start, end, step in self._get_runs():
+            if previous is not None:
+                distances[start - previous] += 1
+            frames = (end - start) // step
+            if frames:
+                distances[step] += frames
+            count += frames + 1
+            previous = end
+
+        # Same step as the step property, detected from the same distances
+        step = self._step
+        if not step:
+            step = 1
+            if count > 2:
+                step = 0
+                for distance in distances:
+                    step = gcd(step, distance)
+            self._detected_step = step
+
+        if all(x % step == 0 for x in distances):
+            holes = sum(y for x, y in distances.items() if x > step)
+            missing = sum((x // step - 1) * y for x, y in distances.items())
+            largest_gap = max(distances) // step - 1 if distances else 0
+        else:
+            # Frames off a forced step, only the missing frames can tell the
+            # gaps
+            holes, missing, largest_gap = _gaps(self.missing, step)
+
+        return SequenceStats(count, holes, missing, largest_gap, step, size)
+
+    def checksum(self, algorithm='md5', workers=None):
+        '''Hashes the files of every frame of the sequence.
+
+        Example:
+
+            >>> import sequencer
+            >>> sequence = sequencer.Sequence(
+            ... head='weta', tail='.jpg', frames=range(1, 19), padding=2,
+            ... folder='test/resources/seq_01')
+            >>> for frame, digest in sequence.checksum(workers=4):
+            ...     print(frame, digest)
+            ...
+            1 63d21a81c6c3b73388592f3ef4f46a7e
+            2 aa12745d6dbcb34657e474bbd8f3c782
+            ...
+
+        Args:
+            algorithm (:obj:`str`, optional): See
+                :func:`sequencer.hashing.new`. Defaults to ``md5``.
+            workers (:obj:`int`, optional): If set, number of threads hashing
+                frames at the same time.
+
+        Yields:
+            tuple: Each frame and its digest, in frame order. The digest is
+            ``None`` if the frame could not be read.
+        '''
+        paths = self.formatted_frames()
+        results = hashing.digests(paths, algorithm, workers)
+        for frame, (_, digest) in zip(self.frames, results):
+            yield frame, digest
+
+    def write_checksums(self, path, algorithm='md5', workers=None):
+        '''Writes a checksum manifest of the sequence, with the digest of
+        every frame file name. Frames that could not be read are skipped.
+
+        Args:
+            path (str): Path to the manifest file.
+            algorithm (:obj:`str`, optional): See :meth:`checksum`.
+            workers (:obj:`int`, optional): See :meth:`checksum`.
+        '''
+        pattern = self._get_template('name')
+        digests = (
+            (pattern % frame, digest)
+            for frame, digest in self.checksum(algorithm, workers)
+            if digest is not None
+        )
+        hashing.write_manifest(path, digests)
+
+    def verify_checksums(self, path, algorithm='md5', workers=None):
+        '''Checks the frames of the sequence against a checksum manifest
+        written by :meth:`write_checksums`.
+
+        Args:
+            path (str): Path to the manifest file.
+            algorithm (:obj:`str`, optional): See :meth:`checksum`.
+            workers (:obj:`int`, optional): See :meth:`checksum`.
+
+        Returns:
+            list: Frames whose digest does not match the manifest, including
+            frames that are not in the manifest or could not be read.
+        '''
+        manifest = hashing.read_manifest(path)
+        pattern = self._get_template('name')
+
+        return [
+            frame for frame, digest in self.checksum(algorithm, workers)
+            if digest is None or manifest.get(pattern % frame) != digest
+        ]
+
+    def _get_orig_path(self, number):
+        return self._get_template('orig') % number
+
+    def freeze(self):
+        '''
+        Returns:
+            FrozenSequence: An immutable copy of the sequence.
+        '''
+        return FrozenSequence(
+            head=self.head,
+            frames=self.frames,
+            padding=self.padding,
+            tail=self.tail,
+            folder=self.folder,
+            step=self._step
+        )
+
     def get_mapping(self):
         '''Returns a mapping between the original sequence elements (keys) and
         the updated data from the instance. This method is useful for changing
@@ -237,24 +697,506 @@ class Sequence(object):
 
         '''
         mapping = collections.OrderedDict()
+        dest_template = self._get_template('dest')
+        orig_len = len(self._orig_frames) - 1
+        orig_step = None
         for index, frame in enumerate(self.frames):
 
-            orig_len = len(self._orig_frames) - 1
             if index > orig_len:
-                number = max(self._orig_frames) + (index - orig_len)
+                if orig_step is None:
+                    orig_step = self._orig_step or _detect_step(
+                        self._orig_frames)
+                number = self._orig_frames[-1] \
+                    + (index - orig_len) * orig_step
             else:
                 number = self._orig_frames[index]
 
-            original = self._get_folder(True) \
-                + self._orig_head \
-                + self._padding_format(True) % number \
-                + self._orig_tail
+            original = self._get_orig_path(number)
 
-            dest = self._get_folder() \
-                + self.head \
-                + self._padding_format() % frame \
-                + self.tail
+            dest = dest_template % frame
 
             mapping[original] = dest
 
         return mapping
+
+
+class FrozenSequence(object):
+    '''Immutable and hashable version of a :obj:`Sequence`, safe to share
+    between threads without copying it.
+
+    Frames are stored once, relative to the start of the sequence, and the
+    ``with_*`` methods return new instances sharing that storage, so
+    offsetting or renaming a frozen sequence doesn't copy its frames.
+
+    Example:
+
+        >>> import sequencer
+        >>> sequence = sequencer.FrozenSequence(
+        ... head='weta.', tail='.jpg', frames=[1, 2, 4], padding=3)
+        >>> shifted = sequence.with_offset(1000).with_padding(4)
+        >>> shifted.frames
+        (1001, 1002, 1004)
+        >>> shifted.format()
+        'weta.%04d.jpg'
+        >>> sequence.frames
+        (1, 2, 4)
+
+    Args:
+        head (str): Head of the sequence
+        frames (list): List of frames the sequence contains
+        padding (int): Frame padding
+        tail (str): Tail of the sequence
+        folder (:obj:`str`, optional): Folder of the sequence
+        step (:obj:`int`, optional): Step of the sequence, see
+            :obj:`Sequence`.
+    '''
+
+    def __init__(self, head, frames, padding, tail, folder=None, step=None):
+        frames = _compact(frames)
+        start = frames[0]
+
+        # Evenly spaced frames are stored as a range
+        relative = _shift(frames, -start)
+        if not isinstance(relative, _range):
+            relative = tuple(relative)
+
+        padding = padding if padding is not None else 1
+        self._init(head, relative, start,
+                   padding if padding > 1 else None, tail, folder, step)
+
+    def _init(self, head, relative, start, padding, tail, folder, step):
+        set_ = super(FrozenSequence, self).__setattr__
+        set_('_head', head)
+        set_('_relative', relative)
+        set_('_start', start)
+        set_('_padding', padding)
+        set_('_tail', tail)
+        set_('_folder', folder)
+        set_('_step', step)
+        set_('_hash', None)
+        set_('_frames', None)
+
+    def _replace(self, **kwargs):
+        values = {
+            'head': self._head,
+            'relative': self._relative,
+            'start': self._start,
+            'padding': self._padding,
+            'tail': self._tail,
+            'folder': self._folder,
+            'step': self._step,
+        }
+        values.update(kwargs)
+
+        frozen = FrozenSequence.__new__(FrozenSequence)
+        frozen._init(**values)
+        return frozen
+
+    def __setattr__(self, name, value):
+        raise AttributeError('%s is immutable' % self.__class__.__name__)
+
+    def __repr__(self):  # pragma: no cover
+        return '<%s "%s" [%s-%s%s]>' % (
+            __name__ + '.' + self.__class__.__name__,
+            self.format(),
+            self.start(),
+            self.end(),
+            'x%s' % self.step if self.step > 1 else ''
+        )
+
+    def __len__(self):
+        return len(self._relative)
+
+    def __contains__(self, frame):
+        frame -= self._start
+        if isinstance(self._relative, _range):
+            return frame in self._relative
+
+        index = bisect.bisect_left(self._relative, frame)
+        return index < len(self._relative) and self._relative[index] == frame
+
+    def _get_runs(self):
+        '''Returns the evenly spaced runs of frames, see :func:`_runs`.'''
+        start = self._start
+        return [(x + start, y + start, z) for x, y, z in _runs(self._relative)]
+
+    def _key(self):
+        return (self._head, self._padding, self._tail, self._folder,
+                self._step, self._start, self._relative)
+
+    def __eq__(self, other):
+        if not isinstance(other, FrozenSequence):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        # Hashing the frames is linear, so it's only done once. Races only
+        # compute the same value twice.
+        if self._hash is None:
+            super(FrozenSequence, self).__setattr__(
+                '_hash', hash(self._key()))
+        return self._hash
+
+    @property
+    def head(self):
+        '''Head of the sequence'''
+        return self._head
+
+    @property
+    def padding(self):
+        '''Frame padding'''
+        return self._padding
+
+    @property
+    def tail(self):
+        '''Tail of the sequence'''
+        return self._tail
+
+    @property
+    def folder(self):
+        '''Folder where the sequence lives'''
+        return self._folder
+
+    @property
+    def frames(self):
+        '''Tuple of frames in the sequence'''
+        frames = self._frames
+        if frames is None:
+            frames = tuple(x + self._start for x in self._relative)
+            super(FrozenSequence, self).__setattr__('_frames', frames)
+        return frames
+
+    @property
+    def step(self):
+        '''Distance between the frames of the sequence'''
+        return self._step or _detect_step(self._relative)
+
+    @property
+    def missing(self):
+        '''Tuple of frames missing in the range of the sequence'''
+        step = self.step
+        if isinstance(self._relative, _range) and \
+                _range_step(self._relative) == step:
+            return ()
+        return tuple(Sequence.find_missing_in_range(self.frames, step))
+
+    def start(self):
+        '''
+        Returns:
+            int: The minimum frame within the frame range.
+        '''
+        return self._start
+
+    def end(self):
+        '''
+        Returns:
+            int: The maximum frame within the frame range.
+        '''
+        return self._start + self._relative[-1]
+
+    def format(self):
+        '''
+        Returns:
+            str: The formatted name of the sequence in the form of \
+                ``head%04d.tail``
+        '''
+        return os.path.normpath('%s%s%s%s' % (
+            _format_folder(self._folder),
+            self._head,
+            _format_padding(self._padding),
+            self._tail
+        ))
+
+    def path_for(self, frame):
+        '''
+        Args:
+            frame (int): Any frame.
+
+        Returns:
+            str: The formatted path of the given frame.
+        '''
+        return os.path.normpath(
+            _format_folder(self._folder)
+            + self._head
+            + _format_padding(self._padding) % frame
+            + self._tail
+        )
+
+    def formatted_frames(self):
+        '''
+        Returns:
+            list: A list with all frames properly formatted
+        '''
+        return [self.path_for(x) for x in self.frames]
+
+    def with_offset(self, amount):
+        '''
+        Args:
+            amount (int): The amount to offset the sequence.
+
+        Returns:
+            FrozenSequence: The offset sequence.
+        '''
+        return self._replace(start=self._start + amount)
+
+    def with_start(self, start):
+        '''
+        Args:
+            start (int): Desired start of the sequence.
+
+        Returns:
+            FrozenSequence: The shifted sequence.
+        '''
+        return self._replace(start=start)
+
+    def with_end(self, end):
+        '''
+        Args:
+            end (int): Desired end of the sequence.
+
+        Returns:
+            FrozenSequence: The shifted sequence.
+        '''
+        return self._replace(start=end - self._relative[-1])
+
+    def with_head(self, head):
+        '''
+        Args:
+            head (str): New head.
+
+        Returns:
+            FrozenSequence: The renamed sequence.
+        '''
+        return self._replace(head=head)
+
+    def with_tail(self, tail):
+        '''
+        Args:
+            tail (str): New tail.
+
+        Returns:
+            FrozenSequence: The renamed sequence.
+        '''
+        return self._replace(tail=tail)
+
+    def with_padding(self, padding):
+        '''
+        Args:
+            padding (int): New frame padding.
+
+        Returns:
+            FrozenSequence: The padded sequence.
+        '''
+        if not padding or padding < 2:
+            padding = None
+        return self._replace(padding=padding)
+
+    def with_folder(self, folder):
+        '''
+        Args:
+            folder (str): New folder.
+
+        Returns:
+            FrozenSequence: The moved sequence.
+        '''
+        return self._replace(folder=folder)
+
+    def with_frames(self, frames):
+        '''
+        Args:
+            frames (list): New frames.
+
+        Returns:
+            FrozenSequence: The sequence with the new frames.
+        '''
+        return FrozenSequence(
+            self._head, frames, self._padding, self._tail, self._folder,
+            self._step)
+
+    def thaw(self):
+        '''
+        Returns:
+            Sequence: A mutable copy of the sequence.
+        '''
+        return Sequence(
+            head=self._head,
+            frames=self.frames,
+            padding=self._padding,
+            tail=self._tail,
+            folder=self._folder,
+            step=self._step
+        )
+
+
+def _scan_sizes(folder, names):
+    '''Returns the sizes of the files of the folder found in names.'''
+    sizes = {}
+    try:
+        if scandir is None:  # pragma: no cover
+            for name in os.listdir(folder):
+                if name in names:
+                    result = os.stat(os.path.join(folder, name))
+                    if stat.S_ISREG(result.st_mode):
+                        sizes[name] = result.st_size
+            return sizes
+
+        for entry in scandir(folder):
+            if entry.name in names and entry.is_file():
+                sizes[entry.name] = entry.stat().st_size
+    except OSError:
+        pass
+
+    return sizes
+
+
+def _stat_sizes(folder, names, workers):
+    '''Returns the sizes of the existing files among the names in the
+    folder, stat'ing them concurrently.'''
+    from concurrent.futures import ThreadPoolExecutor
+
+    def get_size(name):
+        try:
+            result = os.stat(os.path.join(folder, name))
+        except OSError:
+            return name, None
+        # Same as the scandir check, directories are not frames
+        if not stat.S_ISREG(result.st_mode):
+            return name, None
+        return name, result.st_size
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(get_size, names)
+        return {x: size for x, size in results if size is not None}
+
+
+def _compact(frames):
+    '''Sorts and deduplicates the frames, returning them as a range if they
+    are evenly spaced or as a list otherwise.'''
+    if isinstance(frames, _range):
+        if len(frames) < 2 or frames[1] > frames[0]:
+            return frames
+
+    frames = sorted(set(frames))
+    if len(frames) < 2:
+        return frames
+
+    step = frames[1] - frames[0]
+    if frames[-1] - frames[0] != step * (len(frames) - 1):
+        return frames
+
+    pairs = zip(frames, itertools.islice(frames, 1, None))
+    if all(y - x == step for x, y in pairs):
+        return _range(frames[0], frames[-1] + 1, step)
+    return frames
+
+
+def _range_step(frames):
+    return frames[1] - frames[0] if len(frames) > 1 else 1
+
+
+def _runs(frames):
+    '''Splits sorted frames in evenly spaced runs of ``(start, end, step)``
+    tuples, both ends included. Ranges are a single run, and runs with a
+    step bigger than 1 need at least three frames.'''
+    if isinstance(frames, _range):
+        if len(frames):
+            return [(frames[0], frames[-1], _range_step(frames))]
+        return []
+
+    runs = []
+    index = 0
+    count = len(frames)
+    while index < count:
+        end = index
+        step = frames[index + 1] - frames[index] if index + 1 < count else 1
+        while end + 1 < count and frames[end + 1] - frames[end] == step:
+            end += 1
+
+        # Two frames are not enough to tell a step
+        if step > 1 and end - index < 2:
+            end = index
+            step = 1
+
+        runs.append((frames[index], frames[end], step))
+        index = end + 1
+
+    return runs
+
+
+def _shift(frames, amount):
+    '''Offsets the given frames, keeping ranges as ranges.'''
+    if isinstance(frames, _range):
+        return _range(
+            frames[0] + amount, frames[-1] + amount + 1, _range_step(frames))
+    return [x + amount for x in frames]
+
+
+def _detect_step(frames):
+    '''Greatest common divisor of the distances between sorted frames, or 1
+    for less than three frames, which are not enough to tell.'''
+    if len(frames) < 3:
+        return 1
+    if isinstance(frames, _range):
+        return _range_step(frames)
+
+    step = 0
+    for x, y in zip(frames, itertools.islice(frames, 1, None)):
+        step = gcd(step, y - x)
+        if step == 1:
+            break
+    return step or 1
+
+
+def _gaps(missing, step):
+    '''Returns the number of gaps, the number of missing frames and the
+    size of the largest gap of the given missing frames.'''
+    sizes = []
+    previous = None
+    for frame in missing:
+        if previous is not None and frame - previous == step:
+            sizes[-1] += 1
+        else:
+            sizes.append(1)
+        previous = frame
+
+    return len(sizes), len(missing), max(sizes) if sizes else 0
+
+
+def _format_padding(padding):
+    if padding:
+        return '%' + str(padding).zfill(2) + 'd'
+    return '%d'
+
+
+def _format_folder(folder):
+    if folder:
+        folder = folder.replace('\\', os.sep)
+    return folder + os.sep if folder else ''
+
+
+def get_ranges(frames):
+    '''Compacts a sorted iterable of frames into its continuous ranges.
+
+    Example:
+
+        >>> import sequencer.sequence
+        >>> sequencer.sequence.get_ranges([1, 2, 3, 5, 7, 8])
+        [(1, 3), (5, 5), (7, 8)]
+
+    Args:
+        frames (iter): Sorted integer frames
+
+    Returns:
+        list: List of ``(start, end)`` tuples, both ends included.
+    '''
+    ranges = []
+    for frame in frames:
+        if ranges and frame == ranges[-1][1] + 1:
+            ranges[-1][1] = frame
+        else:
+            ranges.append([frame, frame])
+
+    return [tuple(x) for x in ranges]
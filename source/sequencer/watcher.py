@@ -0,0 +1,480 @@
+import os
+import time
+import errno
+import select
+import struct
+import logging
+import collections
+
+from sequencer import collector
+from sequencer import sequence
+
+logger = logging.getLogger(__name__)
+
+# inotify flags, see inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT = struct.Struct('iIII')
+
+# Python 2 file names are bytes already
+try:
+    from os import fsdecode, fsencode
+except ImportError:  # pragma: no cover
+    def fsdecode(name):
+        return name
+
+    fsencode = fsdecode
+
+
+class SequenceDelta(collections.namedtuple(
+        'SequenceDelta', ['format', 'added', 'removed'])):
+    '''Change on a sequence of a watched folder.
+
+    * format: The formatted name of the sequence, as in \
+        :meth:`~sequencer.sequence.Sequence.format`.
+    * added: Sorted list of the frames added to the sequence.
+    * removed: Sorted list of the frames removed from the sequence.
+    '''
+    __slots__ = ()
+
+    def __str__(self):
+        changes = []
+        for frames, action in [(self.added, 'added to'),
+                               (self.removed, 'removed from')]:
+            if frames:
+                ranges = ', '.join(
+                    str(x) if x == y else '%s-%s' % (x, y)
+                    for x, y in sequence.get_ranges(frames)
+                )
+                changes.append('frames %s %s %s' % (
+                    ranges, action, self.format))
+
+        return ', '.join(changes)
+
+
+class Watcher(object):
+    '''Watches a folder and reports the changes on its sequences as
+    :obj:`SequenceDelta` objects, so the work done is proportional to the
+    changes instead of the size of the folder.
+
+    On Linux the changes are read from inotify. Everywhere else, or if
+    ``polling`` is set, the folder is only listed again when its
+    modification time changes, and the listing is diffed against the
+    previous one.
+
+    The first poll reports every sequence already in the folder.
+
+    Example:
+
+        >>> import sequencer.watcher
+        >>> with sequencer.watcher.Watcher('/shots/sh010/render') as watcher:
+        ...     for delta in watcher.watch():
+        ...         print(delta)
+        ...
+        frames 1001-1044 added to /shots/sh010/render/beauty.%04d.exr
+        frames 1045-1050 added to /shots/sh010/render/beauty.%04d.exr
+
+    Args:
+        folder (str): Folder to watch.
+        collection_regex (:obj:`str`, optional): Same as in
+            :func:`~sequencer.collector.collect`.
+        minimum_instances (:obj:`int`, optional): Same as in
+            :func:`~sequencer.collector.collect`.
+        polling (:obj:`bool`, optional): Forces the polling backend.
+        interval (:obj:`float`, optional): Seconds between checks of the
+            polling backend and between polls of :meth:`watch`.
+    '''
+
+    def __init__(self, folder, collection_regex=None, minimum_instances=2,
+                 polling=False, interval=1.0):
+        self.folder = folder
+        self.interval = interval
+        self.minimum_instances = minimum_instances
+
+        self._regex = collection_regex or collector.COLLECTION_REGEX
+        self._groups = {}
+
+        self._backend = None
+        if not polling:
+            try:
+                self._backend = _InotifyBackend(folder)
+            except (OSError, AttributeError) as e:
+                logger.debug('inotify not available, polling: %s', e)
+
+        if self._backend is None:
+            self._backend = _PollingBackend(folder, interval)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        '''Stops watching the folder.'''
+        self._backend.close()
+
+    def poll(self, timeout=0):
+        '''Waits up to ``timeout`` seconds for changes in the folder.
+
+        Args:
+            timeout (:obj:`float`, optional): Seconds to wait for changes.
+
+        Returns:
+            list: List of :obj:`SequenceDelta` objects.
+        '''
+        added, removed = self._backend.read(timeout)
+        return self._update(added, removed)
+
+    def watch(self):
+        '''Polls the folder forever.
+
+        Yields:
+            SequenceDelta: Every change on the sequences of the folder.
+        '''
+        while True:
+            for delta in self.poll(self.interval):
+                yield delta
+
+    def _update(self, added, removed):
+        changes = collections.OrderedDict()
+
+        for names, index in [(sorted(removed), 1), (sorted(added), 0)]:
+            for name in names:
+                _, _, res = collector._match(name, self._regex)
+                if res is None:
+                    continue
+
+                group_id = (res['name'], res['tail'] + res['ext'])
+                group = self._groups.get(group_id)
+                if group is None:
+                    group = self._groups[group_id] = _Group(*group_id)
+
+                # Sequence sizes before any change, to tell when the
+                # minimum is crossed
+                if group_id not in changes:
+                    layout = group.layout()
+                    changes[group_id] = (layout, group.counts(layout), [], [])
+
+                number = res['number']
+                if index == 0:
+                    changed = group.add(number)
+                else:
+                    changed = group.remove(number)
+                if changed:
+                    changes[group_id][index + 2].append(number)
+
+        deltas = []
+        for group_id, (layout, counts, added, removed) in changes.items():
+            group = self._groups[group_id]
+
+            if group.layout() == layout:
+                deltas.extend(self._deltas(group, layout, counts, added,
+                                           removed))
+            else:
+                deltas.extend(self._relayout(group, layout, added, removed))
+
+            if not len(group):
+                self._groups.pop(group_id)
+
+        return deltas
+
+    def _deltas(self, group, layout, counts, added, removed):
+        '''Deltas of the sequences of a group whose layout didn't change,
+        which only depend on the changed numbers.'''
+        paddings = collections.OrderedDict()
+        for number in removed + added:
+            paddings[group.padding(number, layout)] = None
+
+        for padding in paddings:
+            added_ = [int(x) for x in added
+                      if group.padding(x, layout) == padding]
+            removed_ = [int(x) for x in removed
+                        if group.padding(x, layout) == padding]
+            before = counts.get(padding, 0)
+            after = group.count(padding, layout)
+
+            # Sequences below the minimum are not reported, so crossing it
+            # adds or removes the whole sequence
+            if after < self.minimum_instances:
+                if before >= self.minimum_instances:
+                    frames = group.frames(padding, layout)
+                    removed_ = (frames - set(added_)) | set(removed_)
+                else:
+                    removed_ = []
+                added_ = []
+            elif before < self.minimum_instances:
+                added_ = group.frames(padding, layout)
+                removed_ = []
+
+            if added_ or removed_:
+                yield SequenceDelta(
+                    os.path.join(self.folder, group.format(padding)),
+                    sorted(added_),
+                    sorted(removed_)
+                )
+
+    def _relayout(self, group, layout, added, removed):
+        '''Deltas of a group whose sequences changed, for instance when a
+        padded number of a new length splits it, diffing the reported
+        sequences before and after the changes.'''
+        numbers = dict((x, set(y)) for x, y in group.numbers.items())
+        for number in added:
+            numbers.setdefault(len(number), set()).discard(int(number))
+        for number in removed:
+            numbers.setdefault(len(number), set()).add(int(number))
+
+        before = self._visible(group, _partition(numbers, layout))
+        after = self._visible(
+            group, _partition(group.numbers, group.layout()))
+
+        formats = list(before) + [x for x in after if x not in before]
+        for format_ in formats:
+            frames_before = before.get(format_, set())
+            frames_after = after.get(format_, set())
+            added_ = frames_after - frames_before
+            removed_ = frames_before - frames_after
+
+            if added_ or removed_:
+                yield SequenceDelta(
+                    os.path.join(self.folder, format_),
+                    sorted(added_),
+                    sorted(removed_)
+                )
+
+    def _visible(self, group, sequences):
+        '''Returns the frames of the reported sequences, by format.'''
+        return collections.OrderedDict(
+            (group.format(x), y) for x, y in sorted(
+                sequences.items(), key=lambda x: x[0] or 0)
+            if len(y) >= self.minimum_instances
+        )
+
+
+# Layout of the groups split in one sequence per padding
+_SPLIT = 'split'
+
+
+class _Group(object):
+    '''Incremental counterpart of the grouping done by the collector.
+
+    Frames are kept per length of their number, so numbers of different
+    paddings never overwrite each other. Same as in the collector, padded
+    numbers of different lengths are split in one sequence per padding, and
+    every other group is a single sequence.
+    '''
+
+    def __init__(self, head, tail):
+        self.head = head
+        self.tail = tail
+        self.numbers = {}
+        self.padded = 0
+
+    def __len__(self):
+        return sum(len(x) for x in self.numbers.values())
+
+    def add(self, number):
+        frame = int(number)
+        frames = self.numbers.setdefault(len(number), set())
+        if frame in frames:
+            return False
+
+        frames.add(frame)
+        if len(str(frame)) != len(number):
+            self.padded += 1
+        return True
+
+    def remove(self, number):
+        frame = int(number)
+        frames = self.numbers.get(len(number))
+        if not frames or frame not in frames:
+            return False
+
+        frames.remove(frame)
+        if not frames:
+            del self.numbers[len(number)]
+        if len(str(frame)) != len(number):
+            self.padded -= 1
+        return True
+
+    def layout(self):
+        '''Returns ``_SPLIT`` if the group has one sequence per padding, or
+        the padding of its only sequence otherwise.'''
+        if len(self.numbers) == 1:
+            return list(self.numbers)[0]
+        if self.padded:
+            return _SPLIT
+        return None
+
+    def padding(self, number, layout):
+        '''Returns the padding of the sequence a number belongs to.'''
+        return len(number) if layout == _SPLIT else layout
+
+    def counts(self, layout):
+        '''Returns the number of frames of every sequence.'''
+        if layout == _SPLIT:
+            return dict((x, len(y)) for x, y in self.numbers.items())
+        return {layout: len(self)}
+
+    def count(self, padding, layout):
+        if layout == _SPLIT:
+            return len(self.numbers.get(padding, ()))
+        return len(self)
+
+    def frames(self, padding, layout):
+        return _partition(self.numbers, layout).get(padding, set())
+
+    def format(self, padding):
+        # Same as the sequences, a padding of 1 is no padding
+        if not padding or padding < 2:
+            padding = None
+        return self.head + sequence._format_padding(padding) + self.tail
+
+
+def _partition(numbers, layout):
+    '''Returns the frames of every sequence of a group, by padding.'''
+    if layout == _SPLIT:
+        return dict((x, set(y)) for x, y in numbers.items() if y)
+
+    frames = set()
+    for values in numbers.values():
+        frames.update(values)
+    return {layout: frames} if frames else {}
+
+
+class _PollingBackend(object):
+    '''Lists the folder again only when its modification time changes.'''
+
+    def __init__(self, folder, interval):
+        self.folder = folder
+        self.interval = interval
+        self._names = set()
+        self._mtime = None
+
+    def close(self):
+        pass
+
+    def read(self, timeout):
+        start = time.time()
+        while True:
+            added, removed = self._check()
+            remaining = timeout - (time.time() - start)
+            if added or removed or remaining <= 0:
+                return added, removed
+            time.sleep(min(self.interval, remaining))
+
+    def _check(self):
+        stat = os.stat(self.folder)
+        mtime = getattr(stat, 'st_mtime_ns', stat.st_mtime)
+
+        # Changes within the resolution of the timestamp would be lost, so
+        # recently modified folders are always listed
+        recent = time.time() - stat.st_mtime < 2
+        if mtime == self._mtime and not recent:
+            return set(), set()
+
+        self._mtime = mtime
+        names = set(os.listdir(self.folder))
+        added = names - self._names
+        removed = self._names - names
+        self._names = names
+
+        return added, removed
+
+
+class _InotifyBackend(object):
+    '''Reads the changes of the folder from inotify.'''
+
+    _mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE | IN_MOVED_FROM
+
+    def __init__(self, folder):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(
+            ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+
+        self.folder = folder
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+        if libc.inotify_add_watch(
+                self._fd, fsencode(folder), self._mask) < 0:
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), 'inotify_add_watch failed')
+
+        self._names = None
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def read(self, timeout):
+        # The initial listing happens after the watch is added, so no
+        # change is lost in between
+        if self._names is None:
+            self._names = set(os.listdir(self.folder))
+            return set(self._names), set()
+
+        ready = select.select([self._fd], [], [], timeout)[0]
+        if not ready:
+            return set(), set()
+
+        added = set()
+        removed = set()
+        for mask, name in self._events():
+            if mask & IN_Q_OVERFLOW:
+                return self._rescan()
+
+            if mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                if name not in self._names:
+                    added.add(name)
+                removed.discard(name)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                if name in self._names:
+                    removed.add(name)
+                added.discard(name)
+
+        self._names.update(added)
+        self._names.difference_update(removed)
+
+        return added, removed
+
+    def _events(self):
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except OSError as e:
+                if e.errno == errno.EAGAIN:
+                    return
+                raise
+
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                # Decoded the same way as os.listdir, so names that are not
+                # valid in the file system encoding match the listing
+                yield mask, fsdecode(name)
+
+    def _rescan(self):
+        # Drain the queue, the listing is the source of truth now
+        for _ in self._events():
+            pass
+
+        names = set(os.listdir(self.folder))
+        added = names - self._names
+        removed = self._names - names
+        self._names = names
+
+        return added, removed
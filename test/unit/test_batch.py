@@ -0,0 +1,70 @@
+import pytest
+import sequencer
+import sequencer.batch
+
+
+def _sequences():
+    return [
+        sequencer.Sequence('a.', [1, 2, 4, 5], 4, '.exr'),
+        sequencer.Sequence('b.', [10, 12, 13], 4, '.exr'),
+        sequencer.Sequence('c.', [100, 101], 4, '.exr'),
+    ]
+
+
+ACTIONS = [
+    [('offset', 10)],
+    [('offset', [1, 2, 3])],
+    [('set_start', 1001), ('make_continuous', None)],
+    [('make_continuous', None), ('set_end', 50), ('offset', -1)],
+    [('fill_missing', None), ('set_start', [1, 2, 3])],
+    [('fill_missing', None), ('make_continuous', None)],
+    [('make_continuous', None), ('fill_missing', None)],
+]
+
+
+@pytest.mark.parametrize('actions', ACTIONS)
+def test_batch_matches_sequence(actions):
+    expected = _sequences()
+    for sequence in expected:
+        for action, value in actions:
+            if isinstance(value, list):
+                value = value[expected.index(sequence)]
+            getattr(sequence, action)(*([] if value is None else [value]))
+
+    batch = sequencer.batch.SequenceBatch(_sequences())
+    for action, value in actions:
+        getattr(batch, action)(*([] if value is None else [value]))
+
+    assert batch.starts() == [x.start() for x in expected]
+    assert batch.ends() == [x.end() for x in expected]
+    assert [x.frames for x in batch] == [x.frames for x in expected]
+
+
+def test_batch_mapping():
+    batch = sequencer.batch.SequenceBatch(_sequences())
+    batch.set_start(1)
+    batch.set_padding(2)
+
+    mapping = batch.get_mapping()
+
+    assert len(mapping) == 9
+    assert mapping['a.0004.exr'] == 'a.04.exr'
+    assert mapping['c.0101.exr'] == 'c.02.exr'
+
+
+def test_batch_wrong_length():
+    batch = sequencer.batch.SequenceBatch(_sequences())
+    with pytest.raises(ValueError):
+        batch.offset([1, 2])
+
+
+def test_batch_steps():
+    sequence = sequencer.Sequence('a.', [1, 3, 7], 4, '.exr')
+    batch = sequencer.batch.SequenceBatch([sequence])
+
+    batch.make_continuous()
+    batch.set_start(1001)
+
+    assert batch.ends() == [1005]
+    assert sequence.frames == [1, 3, 7]
+    assert batch[0].frames == [1001, 1003, 1005]
@@ -0,0 +1,59 @@
+import os
+import sequencer
+import sequencer.index
+
+
+def _paths(folder, head, tail, padding, frames):
+    return [
+        os.path.join(folder, '%s%s%s' % (head, str(x).zfill(padding), tail))
+        for x in frames
+    ]
+
+
+def _index():
+    items = (
+        _paths('/foo', 'bar.', '.exr', 4, range(1, 11)) +
+        _paths('/foo', 'bar.', '.jpg', 0, range(1, 11)) +
+        _paths('/foo', 'baz_', '.exr', 4, range(1, 11)) +
+        _paths('/qux', 'bar.', '.exr', 4, range(5, 11))
+    )
+    sequences = sequencer.collect(items)[0]
+    return sequences, sequencer.index.SequenceIndex(sequences)
+
+
+def test_index_lookup():
+    sequences, index = _index()
+
+    assert len(index) == 4
+
+    sequence, frame = index.lookup('/foo/bar.0003.exr')
+    assert (sequence.format(), frame) == ('/foo/bar.%04d.exr', 3)
+
+    sequence, frame = index.lookup('/foo/bar.10.jpg')
+    assert (sequence.format(), frame) == ('/foo/bar.%d.jpg', 10)
+
+    assert index.lookup('/qux/bar.0003.exr') is None
+    assert index.lookup('/foo/bar.03.exr') is None
+    assert index.lookup('/foo/readme.txt') is None
+
+
+def test_index_find_and_remove():
+    sequences, index = _index()
+
+    assert len(index.find('/foo')) == 3
+    assert [x.head for x in index.find('/foo', 'baz')] == ['baz_']
+    assert sorted(index.folders()) == ['/foo', '/qux']
+
+    index.difference_update(index.find('/qux'))
+    assert index.find('/qux') == []
+    assert index.folders() == ['/foo']
+    assert index.lookup('/qux/bar.0005.exr') is None
+    assert len(index) == 3
+
+
+def test_index_stepped_sequence():
+    sequence = sequencer.Sequence('bar.', range(1, 101, 2), 4, '.exr', '/foo')
+    index = sequencer.index.SequenceIndex([sequence])
+
+    assert index.lookup('/foo/bar.0051.exr') == (sequence, 51)
+    assert index.lookup('/foo/bar.0050.exr') is None
@@ -0,0 +1,74 @@
+import os
+import sequencer
+import sequencer.merge
+
+
+def _paths(folder, frames):
+    return [os.path.join(folder, 'beauty.%04d.exr' % x) for x in frames]
+
+
+def test_merge_across_folders():
+    items = (
+        _paths('/farm/a', range(1, 11)) +
+        _paths('/farm/b', range(8, 21)) +
+        _paths('/farm/c', range(25, 31)) +
+        ['/farm/a/comp.0001.exr', '/farm/a/comp.0002.exr']
+    )
+    sequences = sequencer.collect(items)[0]
+
+    merged = sequencer.merge.merge(sequences)
+    beauty = [x for x in merged if x.head == 'beauty.'][0]
+
+    assert len(merged) == 2
+    assert beauty.frames == list(range(1, 21)) + list(range(25, 31))
+    assert beauty.missing == list(range(21, 25))
+    assert beauty.sources == [
+        (1, 10, '/farm/a'), (11, 20, '/farm/b'), (25, 30, '/farm/c')]
+    assert beauty.duplicates == [(8, 10, '/farm/b')]
+    assert beauty.source(15) == '/farm/b'
+    assert beauty.source(22) is None
+
+
+def test_merge_mapping():
+    items = _paths('/farm/a', range(1, 3)) + _paths('/farm/b', range(3, 5))
+    merged = sequencer.merge.merge(sequencer.collect(items)[0])[0]
+
+    merged.folder = '/final'
+    merged.set_start(1001)
+
+    mapping = merged.get_mapping()
+    assert list(mapping.keys()) == items
+    assert list(mapping.values()) == _paths('/final', range(1001, 1005))
+
+
+def test_merge_stepped():
+    first = sequencer.Sequence(
+        'beauty.', range(1, 4001, 2), 4, '.exr', folder='/farm/a')
+    second = sequencer.Sequence(
+        'beauty.', range(4001, 8001, 2), 4, '.exr', folder='/farm/b')
+
+    merged = sequencer.merge.merge([first, second])[0]
+
+    assert merged.sources == [(1, 3999, '/farm/a'), (4001, 7999, '/farm/b')]
+    assert merged.duplicates == []
+    assert isinstance(merged._get_sorted_frames(), type(range(0)))
+    assert (merged.start(), merged.end(), merged.step) == (1, 7999, 2)
+    assert merged.missing == []
+    assert merged.source(4001) == '/farm/b'
+    assert merged.source(4002) is None
+
+
+def test_merge_interleaved():
+    odd = sequencer.Sequence(
+        'beauty.', range(1, 10, 2), 4, '.exr', folder='/farm/a')
+    even = sequencer.Sequence(
+        'beauty.', range(2, 11, 2), 4, '.exr', folder='/farm/b')
+    overlap = sequencer.Sequence(
+        'beauty.', [3, 4], 4, '.exr', folder='/farm/c')
+
+    merged = sequencer.merge.merge([odd, even, overlap])[0]
+
+    assert merged.frames == list(range(1, 11))
+    assert merged.source(3) == '/farm/a'
+    assert merged.source(4) == '/farm/b'
+    assert merged.duplicates == [(3, 4, '/farm/c')]
@@ -0,0 +1,86 @@
+import re
+import pytest
+import sequencer
+import sequencer.patterns
+
+
+TEMPLATE_PARMS = [
+    ['*.####.exr', 'sh010.1001.exr', ('sh010.', '1001', '.exr')],
+    ['*_v2.%04d.dpx', 'plate_v2.0001.dpx', ('plate_v2.', '0001', '.dpx')],
+    ['*_v###.%04d.dpx', 'plate_v002.0001.dpx', ValueError],
+    ['*.$F4.bgeo.sc', 'sim.12345.bgeo.sc', ('sim.', '12345', '.bgeo.sc')],
+    ['*_<UDIM>.tif', 'diffuse_1011.tif', ('diffuse_', '1011', '.tif')],
+    ['*.####.exr', 'beauty.101.exr', None],
+    ['beauty.exr', 'beauty.exr', ValueError],
+]
+
+
+@pytest.mark.parametrize('template,item,expected', TEMPLATE_PARMS)
+def test_from_template(template, item, expected):
+    if expected is ValueError:
+        with pytest.raises(ValueError):
+            sequencer.patterns.from_template(template)
+        return
+
+    regex = re.compile(sequencer.patterns.from_template(template))
+    result = regex.match(item)
+
+    if expected is None:
+        assert result is None
+    else:
+        assert result.group('name', 'number', 'tail') == expected
+
+
+def test_registry_priorities():
+    registry = sequencer.patterns.PatternRegistry()
+    registry.register_template('dotted', '*.####.*', priority=10)
+    registry.register_template('udim', '*_<UDIM>.*', priority=5)
+
+    assert registry.names() == ['dotted', 'udim', 'default']
+    assert registry.match('sh010_beauty.1001.exr').pattern == 'dotted'
+    assert registry.match('diffuse_1001.tif').pattern == 'udim'
+    assert registry.match('weta01.jpg').pattern == 'default'
+    assert registry.match('readme.txt') is None
+
+    registry.unregister('dotted')
+    assert registry.match('sh010_beauty.1001.exr') is None
+
+
+def test_registry_flags():
+    registry = sequencer.patterns.PatternRegistry(default=False)
+    registry.register('upper', re.compile(
+        sequencer.patterns.from_template('beauty.####.exr'), re.I))
+    registry.register('lower', sequencer.patterns.from_template('*.#.png'))
+
+    assert registry.match('BEAUTY.0001.exr').pattern == 'upper'
+    # The flags only apply to their pattern
+    assert registry.match('foo.1.PNG') is None
+
+    with pytest.raises(ValueError):
+        registry.register('ascii', re.compile(r'(?P<name>\w+)', re.A))
+
+
+def test_registry_collect():
+    items = ['sh010_beauty.%04d.exr' % x for x in range(1001, 1011)] + \
+        ['weta%02d.jpg' % x for x in range(1, 11)]
+    registry = sequencer.patterns.PatternRegistry()
+    registry.register_template('dotted', '*.####.*', priority=10)
+
+    sequences, extra = sequencer.collect(items, collection_regex=registry)
+
+    assert not extra
+    assert sorted(x.format() for x in sequences) == \
+        ['sh010_beauty.%04d.exr', 'weta%02d.jpg']
+
+
+def test_registry_manifest(tmpdir):
+    manifest = tmpdir.join('manifest.txt')
+    manifest.write('\n'.join(
+        'sh010_beauty.%04d.exr' % x for x in range(1001, 1011)))
+    registry = sequencer.patterns.PatternRegistry()
+    registry.register_template('dotted', '*.####.*', priority=10)
+
+    sequences, extra = sequencer.collect_manifest(
+        str(manifest), collection_regex=registry)
+
+    assert [x.format() for x in sequences] == ['sh010_beauty.%04d.exr']
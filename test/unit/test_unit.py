@@ -315,3 +315,456 @@ def test_a_very_specific_case():
                 assert sequence.formatted_frames() == expected_2
         else:
             assert sequence.formatted_frames() == expected_3
+
+
+def test_collect_assume_sorted():
+    items = sorted(
+        seq('foo.', '.jpg', 3, range(10)) +
+        seq('foo.', '.png', 3, range(5)) +
+        seq('bar_', '.exr', 4, range(1001, 1011)) +
+        ['readme.txt']
+    )
+
+    expected = sequencer.collect(items)
+    sequences, extra = sequencer.collect(items, assume_sorted=True)
+
+    def key(x):
+        return x.format()
+
+    assert extra == expected[1]
+    assert [x.format() for x in sorted(sequences, key=key)] == \
+        [x.format() for x in sorted(expected[0], key=key)]
+    assert [x.frames for x in sorted(sequences, key=key)] == \
+        [x.frames for x in sorted(expected[0], key=key)]
+
+
+def test_collect_assume_sorted_path_order(caplog):
+    items = ['/x/a1.jpg', '/x/a2.jpg', '/x/a3.jpg',
+             '/x/a10/f.1.jpg', '/x/a10/f.2.jpg']
+
+    # Sorted by path, "/x/a10/" lands in between the "/x/a" frames
+    sequences, extra = sequencer.collect(sorted(items), assume_sorted=True)
+    assert extra == ['a1.jpg']
+    assert 'not sorted by folder and name' in caplog.text
+
+    caplog.clear()
+    sequences, extra = sequencer.collect(
+        sorted(items, key=os.path.split), assume_sorted=True)
+    assert extra == []
+    assert sorted(x.frames for x in sequences) == [[1, 2], [1, 2, 3]]
+    assert not caplog.text
+
+
+def test_iter_collect_extra_chunks(monkeypatch):
+    import sequencer.collector
+
+    monkeypatch.setattr(sequencer.collector, 'EXTRA_CHUNK_SIZE', 2)
+    items = ['a%s.txt' % x for x in 'abcde'] + seq('b.', '.jpg', 0, range(2))
+
+    chunks = list(sequencer.iter_collect(items))
+
+    assert [len(x[1]) for x in chunks] == [2, 2, 1, 0]
+    assert [len(x[0]) for x in chunks] == [0, 0, 0, 1]
+
+
+def test_iter_collect_yields_per_group():
+    items = seq('bar.', '.jpg', 0, range(5)) + seq('foo.', '.jpg', 0, range(5))
+
+    chunks = list(sequencer.iter_collect(iter(items)))
+
+    assert len(chunks) == 2
+    assert [x[0][0].head for x in chunks] == ['bar.', 'foo.']
+    assert all(not x[1] for x in chunks)
+
+
+def test_collect_manifest(tmpdir):
+    items = (
+        ['/foo/' + x for x in seq('bar.', '.exr', 4, range(1001, 1011))] +
+        ['/foo/readme.txt', ''] +
+        ['/baz/' + x for x in seq('bar.', '.exr', 4, range(1, 3))]
+    )
+    manifest = tmpdir.join('manifest.txt')
+    manifest.write('\n'.join(items) + '\n')
+
+    sequences, extra = sequencer.collect_manifest(str(manifest))
+    expected = sequencer.collect([x for x in items if x])
+
+    assert extra == ['readme.txt']
+    assert [x.format() for x in sequences] == \
+        [x.format() for x in expected[0]]
+    assert [x.frames for x in sequences] == [x.frames for x in expected[0]]
+    assert all(isinstance(x.head, str) for x in sequences)
+
+
+def test_collect_manifest_extra(tmpdir):
+    import re
+
+    # Text outside the groups of the regex is kept in the discarded elements
+    regex = re.compile(
+        r'(?P<name>[a-z]+)_x_(?P<number>\d+)(?P<tail>)(?P<ext>\.jpg)$')
+    items = ['a_x_01.jpg', 'a_x_02.jpg', 'b_x_1.jpg', 'c_x_01.jpg',
+             'c_x_001.jpg', 'c_x_002.jpg']
+    manifest = tmpdir.join('manifest.txt')
+    manifest.write('\n'.join(items) + '\n')
+
+    sequences, extra = sequencer.collect_manifest(
+        str(manifest), collection_regex=regex)
+
+    assert sorted(extra) == ['b_x_1.jpg', 'c_x_01.jpg']
+    assert [(x.head, x.padding, x.frames) for x in sequences] == \
+        [('a', 2, [1, 2]), ('c', 3, [1, 2])]
+    assert sequencer.collect(items, collection_regex=regex)[1] == extra
+
+
+def test_collect_manifest_empty(tmpdir):
+    manifest = tmpdir.join('manifest.txt')
+    manifest.write('')
+
+    assert sequencer.collect_manifest(str(manifest)) == ([], [])
+
+
+@pytest.mark.parametrize('workers', [None, 4])
+def test_verify(tmpdir, workers):
+    for i in range(1, 11):
+        if i == 3:
+            continue
+        content = 'x' * (100 if i != 7 else 10)
+        if i == 5:
+            content = ''
+        tmpdir.join('foo.%04d.exr' % i).write(content)
+
+    # Folders named as a frame are not frames
+    tmpdir.mkdir('foo.0003.exr')
+
+    sequence = sequencer.Sequence(
+        head='foo.',
+        tail='.exr',
+        frames=range(1, 11),
+        padding=4,
+        folder=str(tmpdir)
+    )
+    report = sequence.verify(workers=workers)
+
+    assert report.missing == [3]
+    assert report.empty == [5]
+    assert report.outliers == [7]
+    assert report.sizes[1] == 100
+
+
+@pytest.mark.parametrize('workers', [None, 4])
+def test_checksums(tmpdir, workers):
+    source = os.path.join(resources, 'seq_01')
+    sequence = sequencer.Sequence(
+        head='weta',
+        tail='.jpg',
+        frames=range(1, 19),
+        padding=2,
+        folder=source
+    )
+    manifest = str(tmpdir.join('checksums.md5'))
+
+    digests = list(sequence.checksum(workers=workers))
+    sequence.write_checksums(manifest, workers=workers)
+
+    assert [x[0] for x in digests] == lrange(1, 19)
+    assert all(x[1] for x in digests)
+    assert sequence.verify_checksums(manifest, workers=workers) == []
+
+    sequence.frames = range(1, 20)
+    assert sequence.verify_checksums(manifest, workers=workers) == [19]
+
+
+def test_format_cache_invalidation():
+    sequence = sequencer.Sequence(
+        head='foo.',
+        tail='.jpg',
+        frames=range(5),
+        padding=3,
+        folder='/bar'
+    )
+
+    assert sequence.path_for(1) == os.path.normpath('/bar/foo.001.jpg')
+
+    sequence.head = 'baz_'
+    sequence.padding = 4
+    sequence.tail = '.exr'
+    sequence.folder = '/qux'
+
+    assert sequence.format() == os.path.normpath('/qux/baz_%04d.exr')
+    assert sequence.path_for(1) == os.path.normpath('/qux/baz_0001.exr')
+    assert list(sequence.get_mapping().items())[0] == \
+        ('/bar/foo.000.jpg', '/qux/baz_0000.exr')
+
+
+def test_lazy_chained_edits():
+    sequence = sequencer.Sequence(
+        head='foo.',
+        tail='.jpg',
+        frames=[5, 1, 2, 9],
+        padding=3
+    )
+
+    sequence.offset(10)
+    assert (sequence.start(), sequence.end()) == (11, 19)
+    assert sequence.missing == [13, 14, 16, 17, 18]
+
+    sequence.offset(-1)
+    sequence.set_start(1001)
+    assert sequence.missing == [1003, 1004, 1006, 1007, 1008]
+
+    sequence.make_continuous()
+    assert sequence.missing == []
+    assert sequence.frames == [1001, 1002, 1003, 1004]
+
+    frames = [3, 1]
+    sequence.frames = frames
+    frames.append(2)
+    assert sequence.frames == [1, 3]
+    assert sequence.missing == [2]
+
+
+def test_frozen_sequence():
+    sequence = sequencer.Sequence(
+        head='foo.',
+        tail='.jpg',
+        frames=[1, 2, 4],
+        padding=3,
+        folder='/bar'
+    )
+    frozen = sequence.freeze()
+
+    with pytest.raises(AttributeError):
+        frozen.head = 'baz.'
+
+    shifted = frozen.with_offset(10).with_padding(4).with_head('baz.')
+
+    assert frozen.frames == (1, 2, 4)
+    assert frozen.missing == (3,)
+    assert shifted.frames == (11, 12, 14)
+    assert (shifted.start(), shifted.end()) == (11, 14)
+    assert shifted.format() == os.path.normpath('/bar/baz.%04d.jpg')
+    assert shifted._relative is frozen._relative
+    assert frozen.with_end(4) is not frozen
+    assert frozen.with_end(4) == frozen
+    assert len({frozen, frozen.with_start(1), shifted}) == 2
+    assert frozen.thaw().frames == [1, 2, 4]
+
+
+def test_collect_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    items = seq('foo.', '.jpg', 4, range(1000)) + \
+        seq('bar_', '.exr', 0, range(500))
+    expected = sorted(x.format() for x in sequencer.collect(items)[0])
+
+    def run(_):
+        return sorted(x.format() for x in sequencer.collect(items)[0])
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert all(x == expected for x in executor.map(run, range(16)))
+
+
+@pytest.mark.parametrize('max_items,fan_in', [
+    (1, 3), (1, 128), (7, 2), (1000, 128)])
+def test_collect_external(tmpdir, monkeypatch, max_items, fan_in):
+    import random
+    import sequencer.collector
+
+    monkeypatch.setattr(sequencer.collector, 'MERGE_FAN_IN', fan_in)
+
+    items = (
+        ['/a/' + x for x in seq('foo.', '.jpg', 3, range(20))] +
+        ['/a/' + x for x in seq('foo.', '.png', 3, range(5))] +
+        ['/b/' + x for x in seq('foo.', '.jpg', 0, range(8, 12))] +
+        ['/c\nd/' + x for x in seq('bar.', '.exr', 2, range(3))] +
+        ['/b/readme.txt', '/a/single.1.jpg']
+    )
+    random.Random(0).shuffle(items)
+
+    expected = sequencer.collect(items)
+    sequences, extra = sequencer.collect(
+        items, max_items=max_items, tmpdir=str(tmpdir))
+
+    def key(x):
+        return x.format()
+
+    assert sorted(extra) == sorted(expected[1])
+    assert [(x.format(), x.frames) for x in sorted(sequences, key=key)] == \
+        [(x.format(), x.frames) for x in sorted(expected[0], key=key)]
+    assert tmpdir.listdir() == []
+
+
+def test_external_runs(tmpdir, monkeypatch):
+    import sequencer.collector
+
+    # Fields spanning several reads
+    monkeypatch.setattr(sequencer.collector, 'RUN_BUFFER_SIZE', 3)
+    records = sorted([
+        ('/a', 'foo.', '', '.jpg', '001', 'foo.001.jpg'),
+        ('/b\nc', 'bar_', '_x', '.exr', '0002', 'bar_0002_x.exr'),
+    ])
+
+    path = sequencer.collector._write_run(records, str(tmpdir))
+    assert list(sequencer.collector._read_run(path)) == records
+
+
+STATS_PARMS = [
+    [[1], (1, 0, 0, 0, 1)],
+    [lrange(1, 11), (10, 0, 0, 0, 1)],
+    [lrange(1, 11) + lrange(15, 20) + [30], (16, 2, 14, 10, 1)],
+    [lrange(1, 100, 2), (50, 0, 0, 0, 2)],
+    [[1, 3, 5, 11, 13], (5, 1, 2, 2, 2)],
+    [[1, 30], (2, 1, 28, 28, 1)],
+    [[1, 5], (2, 1, 3, 3, 1)],
+]
+
+
+@pytest.mark.parametrize('frames,expected', STATS_PARMS)
+def test_stats(frames, expected):
+    sequence = sequencer.Sequence(
+        head='foo.',
+        tail='.jpg',
+        frames=frames,
+        padding=3
+    )
+
+    assert tuple(sequence.stats())[:5] == expected
+    assert sequence.stats().size is None
+    assert sequence.stats().missing == len(sequence.missing)
+
+
+def test_stats_range():
+    sequence = sequencer.Sequence(
+        head='foo.',
+        tail='.jpg',
+        frames=range(1, 10 ** 7, 2),
+        padding=8
+    )
+    sequence.offset(10)
+
+    assert tuple(sequence.stats())[:5] == (5 * 10 ** 6, 0, 0, 0, 2)
+    assert isinstance(sequence._frames, type(range(0)))
+
+
+@pytest.mark.parametrize('frames,step,expected', [
+    [[1, 5, 9, 13], 1, (4, 3, 9, 3, 1)],
+    [[1, 5, 9, 13], 2, (4, 3, 3, 1, 2)],
+    [[1, 4, 7], 2, (3, 1, 2, 2, 2)],
+])
+def test_stats_forced_step(frames, step, expected):
+    sequence = sequencer.Sequence(
+        head='foo.',
+        tail='.jpg',
+        frames=frames,
+        padding=3,
+        step=step
+    )
+
+    stats = sequence.stats()
+    assert tuple(stats)[:5] == expected
+    assert stats.step == sequence.step
+    assert stats.missing == len(sequence.missing)
+
+
+@pytest.mark.parametrize('method,expected', [
+    ['fill_missing', [1, 3, 5, 7]],
+    ['make_continuous', [1, 3, 5]],
+])
+def test_forced_step_off_frames(method, expected):
+    import sequencer.batch
+
+    sequence = sequencer.Sequence('a.', [1, 4, 7], 3, '.exr', step=2)
+
+    # Frames off the step would be dropped or renamed over
+    with pytest.raises(ValueError):
+        getattr(sequence, method)()
+    with pytest.raises(ValueError):
+        getattr(sequencer.batch.SequenceBatch([sequence]), method)()
+    assert sequence.frames == [1, 4, 7]
+
+    sequence.frames = [1, 5, 7]
+    getattr(sequence, method)()
+    assert sequence.frames == expected
+
+
+def test_stats_sizes(tmpdir):
+    import sequencer.batch
+
+    for i in range(1, 6):
+        tmpdir.join('foo.%04d.exr' % i).write('x' * i)
+        tmpdir.join('bar.%04d.exr' % i).write('x' * 10)
+
+    sequences = sequencer.collect(
+        [str(x) for x in tmpdir.listdir()])[0]
+    sequences.sort(key=lambda x: x.head)
+    batch = sequencer.batch.SequenceBatch(sequences)
+
+    assert [x.size for x in batch.stats(sizes=True)] == [50, 15]
+    assert sequences[1].stats(sizes=True).size == 15
+
+
+def test_step_detection():
+    sequence = sequencer.Sequence(
+        head='foo.',
+        tail='.jpg',
+        frames=range(1, 1001, 2),
+        padding=4
+    )
+
+    assert sequence.step == 2
+    assert sequence.missing == []
+    assert isinstance(sequence._frames, type(range(0)))
+    assert repr(sequence).endswith('[1-999x2]>')
+
+    sequence.offset(100)
+    assert (sequence.start(), sequence.end()) == (101, 1099)
+    assert isinstance(sequence._frames, type(range(0)))
+    assert 103 in sequence
+    assert 102 not in sequence
+
+    sequence.frames = [1, 3, 7, 9]
+    assert sequence.step == 2
+    assert sequence.missing == [5]
+
+    sequence.fill_missing()
+    assert sequence.frames == [1, 3, 5, 7, 9]
+
+    sequence.frames = [1, 3, 7, 9]
+    sequence.make_continuous()
+    assert sequence.frames == [1, 3, 5, 7]
+
+    sequence.frames = [1, 5]
+    assert sequence.step == 1
+    assert sequence.missing == [2, 3, 4]
+
+
+def test_explicit_step():
+    sequence = sequencer.Sequence(
+        head='foo.',
+        tail='.jpg',
+        frames=[1, 5, 9, 13],
+        padding=4,
+        step=1
+    )
+
+    assert sequence.step == 1
+    assert sequence.missing == [2, 3, 4, 6, 7, 8, 10, 11, 12]
+
+    sequence.step = None
+    assert sequence.step == 4
+    assert sequence.missing == []
+
+
+def test_step_mapping():
+    sequence = sequencer.Sequence(
+        head='foo.',
+        tail='.jpg',
+        frames=[1, 3, 5],
+        padding=2
+    )
+
+    sequence.frames = range(11, 19, 2)
+    mapping = sequence.get_mapping()
+
+    assert list(mapping.keys()) == seq('foo.', '.jpg', 2, [1, 3, 5, 7])
+    assert list(mapping.values()) == seq('foo.', '.jpg', 2, [11, 13, 15, 17])
@@ -0,0 +1,85 @@
+import pytest
+import sequencer.watcher
+
+
+def _touch(folder, names):
+    for name in names:
+        folder.join(name).write('x')
+
+
+@pytest.mark.parametrize('polling', [True, False])
+def test_watcher_deltas(tmpdir, polling):
+    _touch(tmpdir, ['beauty.%04d.exr' % x for x in range(1001, 1045)])
+    _touch(tmpdir, ['notes.txt'])
+
+    with sequencer.watcher.Watcher(str(tmpdir), polling=polling) as watcher:
+        deltas = watcher.poll()
+        assert len(deltas) == 1
+        assert deltas[0].format == str(tmpdir.join('beauty.%04d.exr'))
+        assert deltas[0].added == list(range(1001, 1045))
+
+        _touch(tmpdir, ['beauty.%04d.exr' % x for x in range(1045, 1051)])
+        deltas = watcher.poll(1)
+        assert [x.added for x in deltas] == [list(range(1045, 1051))]
+        assert str(deltas[0]) == 'frames 1045-1050 added to %s' % (
+            tmpdir.join('beauty.%04d.exr'))
+
+        tmpdir.join('beauty.1010.exr').remove()
+        deltas = watcher.poll(1)
+        assert [(x.added, x.removed) for x in deltas] == [([], [1010])]
+
+
+def test_watcher_minimum_instances(tmpdir):
+    _touch(tmpdir, ['foo.1.jpg'])
+
+    watcher = sequencer.watcher.Watcher(str(tmpdir), polling=True)
+    assert watcher.poll() == []
+
+    _touch(tmpdir, ['foo.2.jpg'])
+    assert [x.added for x in watcher.poll(1)] == [[1, 2]]
+
+    tmpdir.join('foo.1.jpg').remove()
+    assert [x.removed for x in watcher.poll(1)] == [[1, 2]]
+
+
+def test_watcher_paddings(tmpdir):
+    _touch(tmpdir, ['g.%04d.exr' % x for x in range(1, 4)])
+
+    watcher = sequencer.watcher.Watcher(str(tmpdir), polling=True)
+    assert [(x.format, x.added) for x in watcher.poll()] == [
+        (str(tmpdir.join('g.%04d.exr')), [1, 2, 3])]
+
+    # Numbers with another padding are another sequence, as in the collector
+    _touch(tmpdir, ['g.%05d.exr' % x for x in range(1, 3)])
+    assert [(x.format, x.added) for x in watcher.poll(1)] == [
+        (str(tmpdir.join('g.%05d.exr')), [1, 2])]
+    assert sorted(x.format() for x in sequencer.collect(str(tmpdir))[0]) == \
+        ['g.%04d.exr', 'g.%05d.exr']
+
+    tmpdir.join('g.00001.exr').remove()
+    assert [(x.format, x.removed) for x in watcher.poll(1)] == [
+        (str(tmpdir.join('g.%05d.exr')), [1, 2])]
+
+    tmpdir.join('g.00002.exr').remove()
+    tmpdir.join('g.0003.exr').remove()
+    assert [(x.format, x.removed) for x in watcher.poll(1)] == [
+        (str(tmpdir.join('g.%04d.exr')), [3])]
+
+
+@pytest.mark.parametrize('polling', [True, False])
+def test_watcher_undecodable_names(tmpdir, polling):
+    import os
+
+    folder = os.fsencode(str(tmpdir))
+    watcher = sequencer.watcher.Watcher(str(tmpdir), polling=polling)
+    assert watcher.poll() == []
+
+    for frame in (1, 2):
+        name = b'bad\xff.%04d.exr' % frame
+        open(os.path.join(folder, name), 'w').close()
+
+    deltas = watcher.poll(1)
+    assert [(x.format, x.added) for x in deltas] == [
+        (os.path.join(str(tmpdir), os.fsdecode(b'bad\xff.%04d.exr')),
+         [1, 2])]
+    watcher.close()